@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Query embedding helpers shared by the semantic caches.
+
+Embeddings are L2-normalized, so the cosine similarity of two of them is a
+plain dot product.
+"""
+
+import math
+from typing import List
+
+# OpenAI model used for every query embedding
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def embed_text(openai_client, text: str) -> List[float]:
+    """
+    Embed a text with the OpenAI API.
+
+    Args:
+        openai_client: OpenAIClientWithMCP to call
+        text: The text to embed
+
+    Returns:
+        L2-normalized embedding (raises OpenAIError if the API call fails)
+    """
+    response = openai_client.create_embedding(text, model=EMBEDDING_MODEL)
+    vector = response['data'][0]['embedding']
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    """Return the cosine similarity of two L2-normalized embeddings."""
+    return sum(x * y for x, y in zip(a, b))
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Environment configuration shared by the test scripts.
+
+The .env file is parsed once per process and the keys the scripts need are
+exposed as module constants.
+"""
+
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=1)
+def _load() -> Dict[str, Optional[str]]:
+    """Load the .env file once and return the configuration variables."""
+    load_dotenv()
+    return {key: os.environ.get(key) for key in ("OPENAI_API_KEY", "GOOGLE_API_KEY", "GOOGLE_CSE_ID")}
+
+
+OPENAI_API_KEY = _load()["OPENAI_API_KEY"]
+GOOGLE_API_KEY = _load()["GOOGLE_API_KEY"]
+GOOGLE_CSE_ID = _load()["GOOGLE_CSE_ID"]
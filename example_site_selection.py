@@ -67,19 +67,19 @@ def analyze_custom_entry_selection(search_results, selected_sites):
     
     # Check which custom entries were selected
     for site in selected_sites:
-        original_index = site.get('original_index', -1)
+        original_index = site.original_index
         if original_index in custom_indices:
             analysis['custom_entries_selected'] += 1
             analysis['selected_custom_entries'].append({
                 'index': original_index,
-                'title': site.get('title', ''),
-                'confidence': site.get('confidence', 0),
-                'reason': site.get('reason', '')
+                'title': site.title,
+                'confidence': site.confidence,
+                'reason': site.reason
             })
     
     # Find custom entries that were not selected
     for idx in custom_indices:
-        selected = any(site.get('original_index', -1) == idx for site in selected_sites)
+        selected = any(site.original_index == idx for site in selected_sites)
         if not selected:
             analysis['custom_entries_not_selected'].append({
                 'index': idx,
@@ -139,7 +139,7 @@ def main():
         
         # Step 3: Run site selector
         print("🧠 Step 3: Running site selector...")
-        result = agent.select_sites(query, search_results, max_sites=5, debug=False)
+        result = agent.select_sites(query, search_results, max_sites=5, debug=False, keep_indices=custom_indices)
         
         if not result['success']:
             print(f"❌ Site selection failed: {result['error']}")
@@ -152,14 +152,14 @@ def main():
         print("🎯 Step 4: Selected Sites")
         print("-" * 40)
         for i, site in enumerate(result['selected_sites'], 1):
-            is_custom = site.get('original_index', -1) in custom_indices
+            is_custom = site.original_index in custom_indices
             custom_marker = "🎯 CUSTOM" if is_custom else "📄 REGULAR"
             
-            print(f"{i}. {custom_marker} - {site['title']}")
-            print(f"   🔗 {site['url']}")
-            print(f"   ⭐ Confidence: {site['confidence']}/10")
-            print(f"   💭 Reason: {site['reason']}")
-            print(f"   📝 Expected: {site['expected_content']}")
+            print(f"{i}. {custom_marker} - {site.title}")
+            print(f"   🔗 {site.url}")
+            print(f"   ⭐ Confidence: {site.confidence}/10")
+            print(f"   💭 Reason: {site.reason}")
+            print(f"   📝 Expected: {site.expected_content}")
             print()
         
         # Step 5: Analyze custom entry selection
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP session for the test scripts.
+
+All calls go through one pooled keep-alive session, so repeated requests to the
+MCP server or the OpenAI API reuse their TCP (and TLS) connections.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SESSION = requests.Session()
+
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+
+def retry_after(response, cap: float = 2.0) -> float:
+    """
+    Return how long to wait before retrying a rate-limited or unavailable response.
+    
+    Args:
+        response: The HTTP response to inspect
+        cap: Upper bound on the wait, in seconds
+        
+    Returns:
+        Seconds to wait (the Retry-After value, capped), or 0 if the request should not be retried
+    """
+    if response.status_code not in (429, 503):
+        return 0.0
+    try:
+        return max(0.0, min(float(response.headers.get("Retry-After", cap)), cap))
+    except ValueError:
+        # Retry-After given as an HTTP date
+        return cap
@@ -26,18 +26,19 @@ from openai_client_with_mcp import OpenAIClientWithMCP, OpenAIError, MCPError
 class IntelligentSearchTool:
     """Intelligent search tool that lets LLM decide which sites to explore."""
     
-    def __init__(self, openai_api_key: Optional[str] = None, mcp_url: str = "http://localhost:8000"):
+    def __init__(self, openai_api_key: Optional[str] = None, mcp_url: str = "http://localhost:8000", openai_client: Optional[OpenAIClientWithMCP] = None):
         """
         Initialize the intelligent search tool.
         
         Args:
             openai_api_key: OpenAI API key
             mcp_url: MCP server URL
+            openai_client: Existing client to share (optional, a new one is created by default)
         """
         load_dotenv()
         
-        # Initialize OpenAI client
-        self.openai_client = OpenAIClientWithMCP(
+        # Initialize OpenAI client, unless a shared one was passed in
+        self.openai_client = openai_client or OpenAIClientWithMCP(
             api_key=openai_api_key,
             mcp_url=mcp_url
         )
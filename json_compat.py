@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+JSON helpers that use orjson when it is installed.
+
+orjson is an optional speedup; without it everything falls back to the standard
+json module. orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+can catch json.JSONDecodeError (or ValueError) either way.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson  # Optional faster JSON parser/serializer
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes, e.g. for a request body."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Serialize obj to JSON indented by two spaces, for display."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
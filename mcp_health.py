@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared MCP server health check for the test scripts.
+
+The probe result is memoized per 5-second time bucket, so scripts that check the
+server one after another in the same run share a single GET /health.
+"""
+
+import time
+from functools import lru_cache
+from typing import Tuple
+
+import requests
+
+from http_session import SESSION
+
+HEALTH_URL = "http://localhost:8000/health"
+
+# Seconds a probe result is reused for
+HEALTH_TTL = 5
+
+
+@lru_cache(maxsize=1)
+def probe(epoch_bucket: int) -> Tuple[bool, str]:
+    """
+    Check whether the MCP server is healthy.
+    
+    Args:
+        epoch_bucket: Time bucket the result is cached for, e.g. int(time.time() // HEALTH_TTL)
+        
+    Returns:
+        Tuple of (server is healthy, status message to show the user)
+    """
+    try:
+        response = SESSION.get(HEALTH_URL, timeout=5)
+        if response.status_code == 200:
+            return True, "✅ MCP server is running"
+        return False, f"❌ MCP server responded with status {response.status_code}"
+    except requests.exceptions.ConnectionError:
+        return False, "❌ MCP server is not running\nStart it with: ./start_openai_mcp.sh"
+    except Exception as e:
+        return False, f"❌ Error checking MCP server: {e}"
+
+
+def check_mcp_health() -> bool:
+    """Print the (possibly cached) MCP server health status and return whether it is healthy."""
+    healthy, message = probe(int(time.time() // HEALTH_TTL))
+    print(message)
+    return healthy
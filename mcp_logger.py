@@ -6,13 +6,103 @@ This module provides logging capabilities for Model Context Protocol (MCP) traff
 allowing you to see the raw requests and responses being exchanged.
 """
 
+import atexit
 import json
 import logging
+import os
+import queue
+import threading
 import time
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, Any, Optional
 from pathlib import Path
-import os
+
+
+class JSONLWriter:
+    """
+    Background writer that batches JSONL records per target file.
+
+    Records are queued by the caller and drained by a single worker thread,
+    which groups up to ``max_batch`` pending records by file and appends each
+    group with one ``writev`` call instead of one open/write/close per record.
+    """
+    
+    def __init__(self, max_batch: int = 64):
+        """
+        Initialize the writer and start its worker thread.
+        
+        Args:
+            max_batch: Maximum number of records written per batch
+        """
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="mcp-jsonl-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def write(self, path: Path, record: Dict[str, Any]):
+        """
+        Queue a record to be appended to a JSONL file.
+        
+        Args:
+            path: Target JSONL file
+            record: JSON-serializable record
+        """
+        self._queue.put((path, (json.dumps(record) + "\n").encode("utf-8")))
+    
+    def close(self):
+        """Flush all pending records and stop the worker thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self):
+        """Drain the queue in batches until the close sentinel arrives."""
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+            
+            pending = defaultdict(list)
+            for path, line in batch:
+                pending[path].append(line)
+            for path, lines in pending.items():
+                # A bad path or a full disk must not stop the writer for every other file
+                try:
+                    self._append(path, lines)
+                except OSError as e:
+                    logging.getLogger("mcp_traffic").error(
+                        f"Failed to write {len(lines)} record(s) to {path}: {e}"
+                    )
+    
+    @staticmethod
+    def _append(path: Path, lines: list):
+        """Append encoded lines to a file, with a single vectored write where possible."""
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        except OSError:
+            # The log directory may have been cleared while the server runs
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            written = os.writev(fd, lines) if hasattr(os, "writev") else 0
+            # Write whatever a short (or unavailable) writev left over
+            remaining = memoryview(b"".join(lines))[written:]
+            while remaining:
+                remaining = remaining[os.write(fd, remaining):]
+        finally:
+            os.close(fd)
 
 
 class MCPLogger:
@@ -29,6 +119,9 @@ class MCPLogger:
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         
+        # Batched writer for the JSONL files
+        self.writer = JSONLWriter()
+        
         # Set up logging
         self.logger = logging.getLogger("mcp_traffic")
         self.logger.setLevel(getattr(logging, log_level.upper()))
@@ -96,8 +189,7 @@ class MCPLogger:
         self.logger.debug(f"REQUEST DETAILS: {json.dumps(log_entry, indent=2)}")
         
         # Save to JSON file
-        with open(self.log_dir / "mcp_requests.jsonl", "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        self.writer.write(self.log_dir / "mcp_requests.jsonl", log_entry)
     
     def log_response(self, response_data: Dict[str, Any], request_id: Optional[str] = None):
         """
@@ -124,8 +216,7 @@ class MCPLogger:
         self.logger.debug(f"RESPONSE DETAILS: {json.dumps(log_entry, indent=2)}")
         
         # Save to JSON file
-        with open(self.log_dir / "mcp_responses.jsonl", "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        self.writer.write(self.log_dir / "mcp_responses.jsonl", log_entry)
     
     def log_error(self, error: Exception, context: Optional[Dict[str, Any]] = None):
         """
@@ -154,8 +245,7 @@ class MCPLogger:
         self.logger.debug(f"ERROR DETAILS: {json.dumps(log_entry, indent=2)}")
         
         # Save to JSON file
-        with open(self.log_dir / "mcp_errors.jsonl", "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        self.writer.write(self.log_dir / "mcp_errors.jsonl", log_entry)
     
     def log_tool_call(self, tool_name: str, tool_args: Dict[str, Any], result: Any):
         """
@@ -183,8 +273,7 @@ class MCPLogger:
         self.logger.debug(f"TOOL CALL DETAILS: {json.dumps(log_entry, indent=2)}")
         
         # Save to JSON file
-        with open(self.log_dir / "mcp_tool_calls.jsonl", "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        self.writer.write(self.log_dir / "mcp_tool_calls.jsonl", log_entry)
     
     def get_statistics(self) -> Dict[str, Any]:
         """
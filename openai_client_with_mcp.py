@@ -10,6 +10,13 @@ your local MCP server.
 import os
 import json
 import sys
+import time
+import random
+import hashlib
+import inspect
+import sqlite3
+import threading
+import functools
 import requests
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime
@@ -26,6 +33,93 @@ class MCPError(Exception):
     pass
 
 
+# Retries for rate-limited (HTTP 429) API calls, with exponential backoff and full jitter
+_RATE_LIMIT_RETRIES = 4
+_RATE_LIMIT_BACKOFF = 1.0
+_RATE_LIMIT_MAX_WAIT = 20.0
+
+
+class LLMResponseCache:
+    """On-disk store of raw chat completion responses, keyed by request digest."""
+    
+    def __init__(self, path: str = "llm_cache.sqlite"):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key BLOB PRIMARY KEY, response TEXT NOT NULL)")
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> bytes:
+        """Return the SHA-256 digest of a normalized request."""
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).digest()
+    
+    def get(self, key: bytes) -> Optional[Dict]:
+        """Return the cached response for a key, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(self, key: bytes, response: Dict):
+        """Store a response under a key."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)", (key, json.dumps(response)))
+            self._conn.commit()
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def _get_llm_cache() -> LLMResponseCache:
+    """Return the shared response cache, opening it on first use."""
+    global _llm_cache
+    if _llm_cache is None:
+        # Threads calling chat_completion concurrently must not each open their own cache
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache()
+    return _llm_cache
+
+
+def cached_completion(method):
+    """
+    Serve chat completions from an on-disk cache when LLM_CACHE=1.
+    
+    The cache key covers every argument of the wrapped call (messages, model,
+    temperature, ...), so only identical requests are replayed. Streaming
+    requests are never cached.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if os.getenv("LLM_CACHE") != "1":
+            return method(self, *args, **kwargs)
+        
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        request = {name: value for name, value in bound.arguments.items() if name != "self"}
+        if request.get("stream"):
+            return method(self, *args, **kwargs)
+        
+        cache = _get_llm_cache()
+        key = LLMResponseCache.make_key(request)
+        response = cache.get(key)
+        if response is None:
+            response = method(self, *args, **kwargs)
+            cache.put(key, response)
+        return response
+    
+    return wrapper
+
+
 class MCPClient:
     """Client for interacting with the local MCP server."""
     
@@ -139,6 +233,10 @@ class OpenAIClientWithMCP:
             "Content-Type": "application/json"
         }
         
+        # Persistent session so repeated API calls reuse pooled keep-alive connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
         # Initialize MCP client
         self.mcp_client = MCPClient(mcp_url)
     
@@ -159,7 +257,11 @@ class OpenAIClientWithMCP:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
+            for attempt in range(_RATE_LIMIT_RETRIES + 1):
+                response = self.session.post(url, json=data, timeout=30)
+                if response.status_code != 429 or attempt == _RATE_LIMIT_RETRIES:
+                    break
+                time.sleep(random.uniform(0, min(_RATE_LIMIT_MAX_WAIT, _RATE_LIMIT_BACKOFF * 2 ** attempt)))
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -296,13 +398,15 @@ class OpenAIClientWithMCP:
         
         return formatted
     
+    @cached_completion
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
         model: str = "gpt-4o",
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
-        stream: bool = False
+        stream: bool = False,
+        response_format: Optional[Dict[str, str]] = None
     ) -> Dict:
         """
         Create a chat completion (original method without search).
@@ -313,6 +417,7 @@ class OpenAIClientWithMCP:
             temperature: Controls randomness (0-2)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            response_format: Optional output format, e.g. {"type": "json_object"}
             
         Returns:
             API response dictionary
@@ -327,6 +432,9 @@ class OpenAIClientWithMCP:
         if max_tokens:
             data["max_tokens"] = max_tokens
         
+        if response_format:
+            data["response_format"] = response_format
+        
         return self._make_request("/chat/completions", data)
     
     def text_completion(
@@ -395,7 +503,7 @@ class OpenAIClientWithMCP:
             API response dictionary
         """
         try:
-            response = requests.get(f"{self.base_url}/models", headers=self.headers, timeout=30)
+            response = self.session.get(f"{self.base_url}/models", timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
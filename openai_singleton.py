@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Shared OpenAI client for scripts that use several agents or tools.
+
+Passing get_openai() to each of them lets them share one client, and with it one
+pool of keep-alive connections to the OpenAI API.
+"""
+
+from functools import lru_cache
+
+from openai_client_with_mcp import OpenAIClientWithMCP
+
+
+@lru_cache(maxsize=1)
+def get_openai() -> OpenAIClientWithMCP:
+    """Return the process-wide OpenAI client, creating it on first use."""
+    return OpenAIClientWithMCP()
@@ -1,11 +1,15 @@
 import os
 import json
+import atexit
+import logging
+import queue
 import requests
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 from typing import List, Dict, Any
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from logging.handlers import QueueHandler, QueueListener
 import time
 import uuid
 
@@ -19,6 +23,27 @@ load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
 
+# Server console logger; records are written to stdout by a background listener
+logger = logging.getLogger("mcp")
+
+
+def _setup_logging():
+    """Attach a QueueHandler to the server logger and start its listener thread."""
+    if logger.handlers:
+        return
+    log_queue = queue.Queue(-1)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    listener = QueueListener(log_queue, console_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+_setup_logging()
+
 # Initialize FastMCP server
 mcp = FastMCP("OnlineSearch")
 
@@ -27,6 +52,10 @@ class MCPLoggingMiddleware(BaseHTTPMiddleware):
     """Middleware to log all MCP requests and responses."""
     
     async def dispatch(self, request: Request, call_next):
+        # Only MCP JSON-RPC traffic is logged; skip body capture for everything else
+        if not request.url.path.startswith("/mcp"):
+            return await call_next(request)
+
         # Generate unique request ID
         request_id = str(uuid.uuid4())
         
@@ -68,10 +97,27 @@ class MCPLoggingMiddleware(BaseHTTPMiddleware):
             log_mcp_error(e, {"context": "response_parsing", "request_id": request_id})
         
         # Log processing time
-        print(f"⏱️  Request processed in {processing_time:.3f}s")
+        logger.info("⏱️  Request processed in %.3fs", processing_time)
         
         return response
 
+# Error message prefixes for search_web, checked in order so subclasses match first
+_SEARCH_ERROR_PREFIXES = (
+    (requests.exceptions.HTTPError, "HTTP error during search"),
+    (requests.exceptions.ConnectionError, "Network connection error during search"),
+    (requests.exceptions.Timeout, "Search request timed out"),
+    (requests.exceptions.RequestException, "Unexpected search request error"),
+    (json.JSONDecodeError, "Failed to decode API response"),
+)
+
+
+def _search_error_prefix(error: Exception) -> str:
+    """Return the user-facing message prefix for an error raised by search_web."""
+    for error_type, prefix in _SEARCH_ERROR_PREFIXES:
+        if isinstance(error, error_type):
+            return prefix
+    return "An unexpected server error occurred"
+
 # --- Define the Web Search Tool with Enhanced Logging ---
 @mcp.tool()
 def search_web(query: str, num_results: int = 5) -> List[Dict[str, Any]]:
@@ -92,7 +138,7 @@ def search_web(query: str, num_results: int = 5) -> List[Dict[str, Any]]:
     
     if not GOOGLE_API_KEY or not GOOGLE_CSE_ID:
         error_msg = "Server configuration error: API keys missing."
-        print(f"Error: {error_msg}")
+        logger.error("Error: %s", error_msg)
         result = [{"error": error_msg}]
         log_tool_call("search_web", tool_args, result)
         return result
@@ -102,68 +148,37 @@ def search_web(query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         "key": GOOGLE_API_KEY,
         "cx": GOOGLE_CSE_ID,
         "q": query,
-        "num": min(num_results, 10)  # Google Custom Search API max is 10 results per query
+        "num": min(num_results, 10),  # Google Custom Search API max is 10 results per query
+        "fields": "items(title,link,snippet)"  # Partial response: only the keys we return
     }
 
     try:
-        print(f"🔍 Performing web search for query: '{query}' with {params['num']} results...")
+        logger.info("🔍 Performing web search for query: '%s' with %d results...", query, params['num'])
         response = requests.get(search_url, params=params)
         response.raise_for_status()
         search_data = response.json()
 
         results = []
         if "items" in search_data:
-            for item in search_data["items"]:
-                results.append({
-                    "title": item.get("title"),
-                    "link": item.get("link"),
-                    "snippet": item.get("snippet")
-                })
-            print(f"✅ Found {len(results)} search results.")
+            results = [
+                {"title": item.get("title"), "link": item.get("link"), "snippet": item.get("snippet")}
+                for item in search_data["items"]
+            ]
+            logger.info("✅ Found %d search results.", len(results))
         else:
-            print("❌ No search results found.")
+            logger.info("❌ No search results found.")
             if "error" in search_data:
                 error_msg = f"Google API Error: {search_data['error'].get('message', 'Unknown error')}"
-                print(f"Google API Error: {error_msg}")
+                logger.error("Google API Error: %s", error_msg)
                 results = [{"error": error_msg}]
 
         # Log the tool call result
         log_tool_call("search_web", tool_args, results)
         return results
 
-    except requests.exceptions.HTTPError as http_err:
-        error_msg = f"HTTP error during search: {http_err}"
-        print(f"❌ {error_msg}")
-        result = [{"error": error_msg}]
-        log_tool_call("search_web", tool_args, result)
-        return result
-    except requests.exceptions.ConnectionError as conn_err:
-        error_msg = f"Network connection error during search: {conn_err}"
-        print(f"❌ {error_msg}")
-        result = [{"error": error_msg}]
-        log_tool_call("search_web", tool_args, result)
-        return result
-    except requests.exceptions.Timeout as timeout_err:
-        error_msg = f"Search request timed out: {timeout_err}"
-        print(f"❌ {error_msg}")
-        result = [{"error": error_msg}]
-        log_tool_call("search_web", tool_args, result)
-        return result
-    except requests.exceptions.RequestException as req_err:
-        error_msg = f"Unexpected search request error: {req_err}"
-        print(f"❌ {error_msg}")
-        result = [{"error": error_msg}]
-        log_tool_call("search_web", tool_args, result)
-        return result
-    except json.JSONDecodeError as json_err:
-        error_msg = f"Failed to decode API response: {json_err}"
-        print(f"❌ {error_msg}")
-        result = [{"error": error_msg}]
-        log_tool_call("search_web", tool_args, result)
-        return result
     except Exception as e:
-        error_msg = f"An unexpected server error occurred: {e}"
-        print(f"❌ {error_msg}")
+        error_msg = f"{_search_error_prefix(e)}: {e}"
+        logger.error("❌ %s", error_msg)
         result = [{"error": error_msg}]
         log_tool_call("search_web", tool_args, result)
         return result
@@ -11,38 +11,307 @@ The agent is designed to work with injected custom entries that can be optimized
 import os
 import json
 import sys
-from typing import List, Dict, Any, Optional
+import logging
+import string
+import statistics
+import time
+import hashlib
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from dotenv import load_dotenv
 import re
 
 # Import OpenAI client
 from openai_client_with_mcp import OpenAIClientWithMCP, OpenAIError
+from embeddings import cosine_similarity, embed_text
+import json_compat
+
+# Progress and errors from select_sites; silent below WARNING unless logging is configured
+_log = logging.getLogger(__name__)
+
+# Markdown code block wrapper that LLMs sometimes put around JSON answers
+_CODEBLOCK_RE = re.compile(r"^```(?:json)?\s*([\s\S]*?)\s*```\Z", re.IGNORECASE)
+
+# Key phrases counted in selection reasons
+_KEY_PHRASES = ('official', 'authoritative', 'comprehensive', 'detailed', 'latest', 'recent', 'expert', 'reputable')
+
+# Matches any key phrase; the lookahead also finds overlapping matches
+_KEY_PHRASE_RE = re.compile(r"(?=(" + "|".join(map(re.escape, _KEY_PHRASES)) + r"))")
+
+# Word tokens used for BM25 scoring of search results
+_TOKEN_RE = re.compile(r"\w+")
+
+# Static analysis prompt; filled in with query, formatted_results and max_sites
+_ANALYSIS_PROMPT_TEMPLATE = string.Template("""
+You are an expert web researcher. I have performed a search for: "${query}"
+
+Here are the search results I found:
+
+${formatted_results}
+
+Your task is to analyze these results and select the ${max_sites} most valuable websites to visit for deeper content extraction.
+
+Consider these criteria when evaluating each site:
+
+1. **Relevance**: How well does the site match the search query?
+2. **Authority**: Is this a reputable, authoritative source?
+3. **Content Quality**: Does the snippet suggest high-quality, detailed content?
+4. **Uniqueness**: Does this site offer unique information not found elsewhere?
+5. **Recency**: Is the information likely to be up-to-date?
+6. **Depth**: Does the site likely contain comprehensive information?
+
+For each site you select, provide:
+- A confidence score (1-10, where 10 is highest confidence)
+- A brief reason why this site is valuable
+- What specific information you expect to find
+
+IMPORTANT: Respond ONLY with a valid JSON object whose "selected_sites" key holds the list of selected sites. Do not include any other text, explanations, or markdown formatting.
+
+Example response format:
+{
+  "selected_sites": [
+    {
+      "url": "https://example.com",
+      "title": "Site Title",
+      "confidence": 8,
+      "reason": "Brief explanation of why this site is valuable",
+      "expected_content": "What specific information you expect to find",
+      "original_index": 2
+    }
+  ]
+}
+
+Only include sites with confidence score >= 6. Limit to maximum ${max_sites} sites.
+""")
+
+# Narrow follow-up prompt: would a new result join the current top selections?
+_PAIRWISE_PROMPT_TEMPLATE = string.Template("""
+You are an expert web researcher. For the search "${query}", these sites are currently selected as the most valuable to visit for deeper content extraction:
+
+${formatted_selection}
+
+A new search result is now available:
+
+${formatted_candidate}
+
+Using the same criteria (relevance, authority, content quality, uniqueness, recency, depth), would you include this new result among the ${top_k} most valuable sites to visit?
+
+IMPORTANT: Respond ONLY with a valid JSON object. Do not include any other text, explanations, or markdown formatting.
+
+Example response format:
+{
+  "selected": true,
+  "confidence": 8,
+  "reason": "Brief explanation of your decision",
+  "expected_content": "What specific information you expect to find"
+}
+
+Only answer "selected": true with a confidence score >= 6.
+""")
+
+
+def _bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Score documents against a query with Okapi BM25.
+    
+    Args:
+        query: The search query
+        documents: Texts to score
+        k1: Term frequency saturation
+        b: Document length normalization
+        
+    Returns:
+        One score per document, in input order
+    """
+    tokenized = [Counter(_TOKEN_RE.findall(doc.lower())) for doc in documents]
+    lengths = [sum(tf.values()) for tf in tokenized]
+    n_docs = len(documents)
+    avg_length = sum(lengths) / n_docs if n_docs else 0.0
+    document_frequency = Counter(term for tf in tokenized for term in tf)
+    
+    scores = []
+    for tf, length in zip(tokenized, lengths):
+        norm = k1 * (1 - b + b * length / avg_length) if avg_length else k1
+        score = 0.0
+        for term in set(_TOKEN_RE.findall(query.lower())):
+            freq = tf.get(term)
+            if freq:
+                df = document_frequency[term]
+                idf = math.log((n_docs - df + 0.5) / (df + 0.5) + 1)
+                score += idf * freq * (k1 + 1) / (freq + norm)
+        scores.append(score)
+    return scores
+
+
+def prefilter_results(
+    query: str,
+    search_results: List[Dict[str, Any]],
+    top_m: int = 15,
+    keep_indices: Optional[List[int]] = None
+) -> List[int]:
+    """
+    Pick the search results worth showing to the LLM, ranked locally with BM25.
+    
+    Args:
+        query: The search query
+        search_results: List of search results
+        top_m: Maximum number of results to keep besides keep_indices
+        keep_indices: Indices that are always kept, e.g. the MCP Test Entry the
+            optimizer loop needs the LLM to see
+        
+    Returns:
+        Indices into search_results of the kept results, in original order
+    """
+    if len(search_results) <= top_m:
+        return list(range(len(search_results)))
+    
+    scores = _bm25_scores(query, [f"{r.get('title') or ''} {r.get('snippet') or ''}" for r in search_results])
+    kept = set(sorted(range(len(search_results)), key=lambda i: scores[i], reverse=True)[:top_m])
+    kept.update(i for i in keep_indices or () if 0 <= i < len(search_results))
+    return sorted(kept)
+
+
+class SelectedSite(NamedTuple):
+    """
+    A site chosen by the selector, with the LLM's confidence and reasoning.
+    
+    The defaults fill in fields missing from an LLM-selected site.
+    """
+    url: str = ''
+    title: str = 'Unknown'
+    confidence: int = 5
+    reason: str = 'No reason provided'
+    expected_content: str = 'General information'
+    original_index: int = -1  # Index in original search results
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the site as a plain dictionary for JSON output."""
+        return dict(self._asdict())
+
+
+class _SemanticCache:
+    """
+    In-memory LRU cache of site selections keyed by query embedding.
+    
+    Entries are bucketed by an exact digest of the search results, so a hit
+    requires the same results and a query whose embedding is within ``tau``
+    cosine similarity of a cached one.
+    """
+    
+    def __init__(self, max_entries: int = 128, ttl: float = 300.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached selections
+            ttl: Seconds before a cached selection expires
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (digest, query) -> (embedding, value, stored_at)
+        self._lock = threading.Lock()
+    
+    def get(self, digest: str, embedding: List[float], tau: float = 0.9) -> Optional[Any]:
+        """
+        Look up the most similar cached value for a results digest.
+        
+        Args:
+            digest: Digest of the search results
+            embedding: L2-normalized query embedding
+            tau: Minimum cosine similarity for a hit
+            
+        Returns:
+            The cached value, or None on a miss
+        """
+        now = time.time()
+        best_key, best_score = None, tau
+        with self._lock:
+            for key, (cached_embedding, _, stored_at) in list(self._entries.items()):
+                if now - stored_at > self.ttl:
+                    del self._entries[key]
+                    continue
+                if key[0] != digest:
+                    continue
+                score = cosine_similarity(embedding, cached_embedding)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][1]
+    
+    def put(self, digest: str, query: str, embedding: List[float], value: Any):
+        """
+        Store a value, evicting the least recently used entry when full.
+        
+        Args:
+            digest: Digest of the search results
+            query: The query the value was computed for
+            embedding: L2-normalized query embedding
+            value: Value to cache
+        """
+        key = (digest, query)
+        with self._lock:
+            self._entries[key] = (embedding, value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
 
 
 class SiteSelectorAgent:
     """Agent that selects which websites to visit based on search results."""
     
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = None,
+        use_cache: bool = False,
+        cache_ttl: float = 300.0,
+        local_first: bool = False,
+        local_margin: float = 0.05,
+        openai_client=None
+    ):
         """
         Initialize the site selector agent.
         
         Args:
             openai_api_key: OpenAI API key (optional, uses env var by default)
+            use_cache: Whether to reuse selections for near-duplicate queries (costs an
+                extra embedding call per new query, so only worth it when queries repeat)
+            cache_ttl: Seconds a cached selection stays valid
+            local_first: Whether to try a local BM25 ranking before asking the LLM
+            local_margin: Minimum normalized score gap at the selection cutoff for
+                the local ranking to be trusted
+            openai_client: Existing OpenAIClientWithMCP to share (optional, a new one is created by default)
         """
         load_dotenv()
         
-        # Initialize OpenAI client
-        self.openai_client = OpenAIClientWithMCP(
-            api_key=openai_api_key,
-            mcp_url="http://localhost:8000"  # We'll use this for search, but agent works independently
-        )
+        # Initialize OpenAI client, unless a shared one was passed in
+        if openai_client is None:
+            openai_client = OpenAIClientWithMCP(
+                api_key=openai_api_key,
+                mcp_url="http://localhost:8000"  # We'll use this for search, but agent works independently
+            )
+        self.openai_client = openai_client
+        
+        # Semantic cache of successful selections, plus memoized query embeddings
+        self.cache = _SemanticCache(ttl=cache_ttl) if use_cache else None
+        self._query_embeddings = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()  # select_sites_batch embeds from several threads
+        
+        self.local_first = local_first
+        self.local_margin = local_margin
     
     def select_sites(
         self, 
         query: str, 
         search_results: List[Dict[str, Any]], 
         max_sites: int = 5,
-        debug: bool = False
+        debug: bool = False,
+        keep_indices: Optional[List[int]] = None
     ) -> Dict[str, Any]:
         """
         Select which sites to visit based on search results.
@@ -52,18 +321,51 @@ class SiteSelectorAgent:
             search_results: List of search results, each with 'title', 'link', 'snippet'
             max_sites: Maximum number of sites to select
             debug: Whether to print debug information
+            keep_indices: Indices of results that must reach the LLM even when the
+                BM25 prefilter would drop them (e.g. the MCP Test Entry)
             
         Returns:
             Dictionary with selection results including:
-            - selected_sites: List of selected sites with confidence and reasoning
+            - selected_sites: List of SelectedSite entries with confidence and reasoning
             - raw_llm_response: The raw LLM response for debugging
             - success: Whether the selection was successful
             - error: Error message if failed
         """
-        print(f"🧠 Site Selector Agent analyzing {len(search_results)} search results...")
+        _log.info("🧠 Site Selector Agent analyzing %d search results...", len(search_results))
+        
+        # Clear-cut rankings are answered locally without an LLM call
+        if self.local_first and not debug:
+            local_sites = self._local_selection(query, search_results, max_sites)
+            if local_sites is not None:
+                _log.info("⚡ Selected %d sites locally", len(local_sites))
+                return {
+                    'selected_sites': local_sites,
+                    'raw_llm_response': None,
+                    'success': True,
+                    'error': None
+                }
         
-        # Format search results for LLM
-        formatted_results = self._format_search_results(search_results)
+        # Reuse a previous selection for a near-duplicate query over the same results
+        results_digest = query_embedding = None
+        if self.cache is not None:
+            results_digest = self._results_digest(search_results, max_sites, keep_indices)
+            query_embedding = self._embed_query(query)
+            if query_embedding is not None:
+                cached = self.cache.get(results_digest, query_embedding)
+                if cached is not None:
+                    validated_sites, llm_response = cached
+                    _log.info("⚡ Reused cached selection of %d sites", len(validated_sites))
+                    return {
+                        'selected_sites': list(validated_sites),
+                        'raw_llm_response': llm_response,
+                        'success': True,
+                        'error': None
+                    }
+        
+        # Format the locally top-ranked search results for LLM, numbered as in the full list
+        formatted_results = self._format_search_results(
+            search_results, prefilter_results(query, search_results, keep_indices=keep_indices)
+        )
         
         # Create the analysis prompt
         analysis_prompt = self._create_analysis_prompt(query, formatted_results, max_sites)
@@ -85,7 +387,7 @@ class SiteSelectorAgent:
                     "role": "user", 
                     "content": analysis_prompt
                 }
-            ], model="gpt-4o", temperature=0.3)
+            ], model="gpt-4o", temperature=0.0, response_format={"type": "json_object"})
             
             # Extract LLM response
             llm_response = response['choices'][0]['message']['content']
@@ -100,33 +402,33 @@ class SiteSelectorAgent:
             try:
                 # Robustly strip markdown code block wrappers if present
                 cleaned_response = llm_response.strip()
-                # Remove triple backtick code blocks (with or without 'json')
-                codeblock_match = re.match(r"^```(?:json)?\s*([\s\S]*?)\s*```$", cleaned_response, re.IGNORECASE)
-                if codeblock_match:
-                    cleaned_response = codeblock_match.group(1).strip()
+                # Remove triple backtick code blocks (with or without 'json'); bare JSON skips the regex
+                if cleaned_response[:1] not in ('{', '['):
+                    codeblock_match = _CODEBLOCK_RE.match(cleaned_response)
+                    if codeblock_match:
+                        cleaned_response = codeblock_match.group(1).strip()
                 # Remove any leading/trailing backticks or whitespace
                 cleaned_response = cleaned_response.strip('`\n ')
                 
-                selected_sites = json.loads(cleaned_response)
+                selected_sites = json_compat.loads(cleaned_response)
                 
-                # Validate the response structure
+                # Validate the response structure; JSON mode wraps the list in an object
+                if isinstance(selected_sites, dict):
+                    selected_sites = selected_sites.get('selected_sites')
                 if not isinstance(selected_sites, list):
                     raise ValueError("LLM response is not a list")
                 
-                # Validate each selected site
-                validated_sites = []
-                for site in selected_sites:
-                    if isinstance(site, dict) and 'url' in site:
-                        validated_sites.append({
-                            'url': site.get('url', ''),
-                            'title': site.get('title', 'Unknown'),
-                            'confidence': site.get('confidence', 5),
-                            'reason': site.get('reason', 'No reason provided'),
-                            'expected_content': site.get('expected_content', 'General information'),
-                            'original_index': site.get('original_index', -1)  # Index in original search results
-                        })
+                # Validate each selected site, filling in missing fields from the SelectedSite defaults
+                validated_sites = [
+                    SelectedSite(**{field: site.get(field, default) for field, default in SelectedSite._field_defaults.items()})
+                    for site in selected_sites
+                    if isinstance(site, dict) and 'url' in site
+                ]
+                
+                _log.info("✅ Successfully selected %d sites", len(validated_sites))
                 
-                print(f"✅ Successfully selected {len(validated_sites)} sites")
+                if query_embedding is not None:
+                    self.cache.put(results_digest, query, query_embedding, (tuple(validated_sites), llm_response))
                 
                 return {
                     'selected_sites': validated_sites,
@@ -136,8 +438,7 @@ class SiteSelectorAgent:
                 }
                 
             except json.JSONDecodeError as e:
-                print(f"❌ Failed to parse LLM response as JSON: {e}")
-                print(f"Raw LLM response was:\n{llm_response}\n{'='*50}")
+                _log.error("❌ Failed to parse LLM response as JSON: %s\nRaw LLM response was:\n%s", e, llm_response)
                 return {
                     'selected_sites': self._fallback_selection(search_results, max_sites),
                     'raw_llm_response': llm_response,
@@ -146,7 +447,7 @@ class SiteSelectorAgent:
                 }
                 
         except OpenAIError as e:
-            print(f"❌ LLM analysis failed: {e}")
+            _log.error("❌ LLM analysis failed: %s", e)
             return {
                 'selected_sites': self._fallback_selection(search_results, max_sites),
                 'raw_llm_response': None,
@@ -154,7 +455,7 @@ class SiteSelectorAgent:
                 'error': f"OpenAI API error: {str(e)}"
             }
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            _log.error("❌ Unexpected error: %s", e)
             return {
                 'selected_sites': self._fallback_selection(search_results, max_sites),
                 'raw_llm_response': None,
@@ -162,6 +463,168 @@ class SiteSelectorAgent:
                 'error': f"Unexpected error: {str(e)}"
             }
     
+    def select_sites_batch(
+        self,
+        items: List[Tuple[str, List[Dict[str, Any]]]],
+        max_sites: int = 5,
+        debug: bool = False,
+        max_workers: int = 8,
+        keep_indices: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run select_sites for several independent (query, search_results) pairs concurrently.
+        
+        Args:
+            items: List of (query, search_results) pairs
+            max_sites: Maximum number of sites to select per pair
+            debug: Whether to print debug information
+            max_workers: Maximum number of concurrent selector calls
+            keep_indices: Indices of results always shown to the LLM, for every pair
+            
+        Returns:
+            One select_sites result dictionary per pair, in input order
+        """
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(
+                lambda item: self.select_sites(item[0], item[1], max_sites=max_sites, debug=debug, keep_indices=keep_indices),
+                items
+            ))
+    
+    def would_select(
+        self,
+        query: str,
+        selected_sites: List[SelectedSite],
+        candidate: Dict[str, Any],
+        candidate_index: int,
+        top_k: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Check whether a single new result would join the current top selections.
+        
+        Much cheaper than select_sites, since the prompt carries only the top_k
+        current selections and the candidate instead of every search result.
+        
+        Args:
+            query: The original search query
+            selected_sites: Sites from a previous select_sites call
+            candidate: The new search result, with 'title', 'link', 'snippet'
+            candidate_index: Index of the candidate in the search results
+            top_k: Number of current selections to compare against
+            
+        Returns:
+            Dictionary shaped like the select_sites result; selected_sites holds the
+            top_k current selections, plus the candidate if it would be selected
+        """
+        top_sites = list(selected_sites[:top_k])
+        prompt = _PAIRWISE_PROMPT_TEMPLATE.substitute(
+            query=query,
+            formatted_selection="\n\n".join(
+                f"{i}. {site.title}\n   URL: {site.url}\n   Reason: {site.reason}"
+                for i, site in enumerate(top_sites, 1)
+            ),
+            formatted_candidate=f"{candidate.get('title', 'No title')}\n   URL: {candidate.get('link', 'No link')}\n   Snippet: {candidate.get('snippet', 'No snippet')}",
+            top_k=top_k
+        )
+        
+        llm_response = None
+        try:
+            response = self.openai_client.chat_completion([
+                {
+                    "role": "system",
+                    "content": "You are an expert web researcher and content curator. Always respond with valid JSON only."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ], model="gpt-4o", temperature=0.0, response_format={"type": "json_object"})
+            llm_response = response['choices'][0]['message']['content']
+            verdict = json_compat.loads(llm_response)
+            if not isinstance(verdict, dict):
+                raise ValueError("LLM response is not an object")
+        except (OpenAIError, ValueError, KeyError, IndexError) as e:
+            _log.error("❌ Pairwise selection check failed: %s", e)
+            return {
+                'selected_sites': top_sites,
+                'raw_llm_response': llm_response,
+                'success': False,
+                'error': str(e)
+            }
+        
+        # Accept any numeric confidence, e.g. 7.0 or "8"
+        try:
+            confidence = float(verdict.get('confidence', 5))
+        except (TypeError, ValueError):
+            confidence = 0.0
+        if not math.isfinite(confidence):
+            confidence = 0.0
+        elif confidence.is_integer():
+            confidence = int(confidence)
+        if verdict.get('selected') is True and confidence >= 6:
+            top_sites.append(SelectedSite(
+                url=candidate.get('link', ''),
+                title=candidate.get('title', 'Unknown'),
+                confidence=confidence,
+                reason=verdict.get('reason', 'No reason provided'),
+                expected_content=verdict.get('expected_content', 'General information'),
+                original_index=candidate_index
+            ))
+        return {
+            'selected_sites': top_sites,
+            'raw_llm_response': llm_response,
+            'success': True,
+            'error': None
+        }
+    
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        """
+        Embed a query for cache lookups, memoizing recent queries.
+        
+        Args:
+            query: The search query
+            
+        Returns:
+            L2-normalized embedding, or None if the embedding call failed
+        """
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            try:
+                embedding = embed_text(self.openai_client, query)
+            except OpenAIError as e:
+                _log.warning("⚠️  Query embedding failed, skipping cache: %s", e)
+                return None
+            with self._query_embeddings_lock:
+                self._query_embeddings[query] = embedding
+                if len(self._query_embeddings) > self.cache.max_entries:
+                    self._query_embeddings.popitem(last=False)
+        return embedding
+    
+    def _results_digest(
+        self,
+        search_results: List[Dict[str, Any]],
+        max_sites: int,
+        keep_indices: Optional[List[int]] = None
+    ) -> str:
+        """
+        Digest the search results in order, so cached original_index values stay valid.
+        
+        Args:
+            search_results: List of search results
+            max_sites: Maximum number of sites to select
+            keep_indices: Indices the prefilter always keeps
+            
+        Returns:
+            Hex digest identifying the results, selection size and kept indices
+        """
+        digest = hashlib.sha256(f"{max_sites} {sorted(keep_indices or ())}".encode())
+        for result in search_results:
+            for key in ("link", "title", "snippet", "error"):
+                digest.update(b"\0" + str(result.get(key, "")).encode("utf-8"))
+        return digest.hexdigest()
+    
     def _create_analysis_prompt(self, query: str, formatted_results: str, max_sites: int) -> str:
         """
         Create the analysis prompt for the LLM.
@@ -174,58 +637,24 @@ class SiteSelectorAgent:
         Returns:
             The analysis prompt
         """
-        return f"""
-You are an expert web researcher. I have performed a search for: "{query}"
-
-Here are the search results I found:
-
-{formatted_results}
-
-Your task is to analyze these results and select the {max_sites} most valuable websites to visit for deeper content extraction.
-
-Consider these criteria when evaluating each site:
-
-1. **Relevance**: How well does the site match the search query?
-2. **Authority**: Is this a reputable, authoritative source?
-3. **Content Quality**: Does the snippet suggest high-quality, detailed content?
-4. **Uniqueness**: Does this site offer unique information not found elsewhere?
-5. **Recency**: Is the information likely to be up-to-date?
-6. **Depth**: Does the site likely contain comprehensive information?
-
-For each site you select, provide:
-- A confidence score (1-10, where 10 is highest confidence)
-- A brief reason why this site is valuable
-- What specific information you expect to find
-
-IMPORTANT: Respond ONLY with a valid JSON array. Do not include any other text, explanations, or markdown formatting.
-
-Example response format:
-[
-  {{
-    "url": "https://example.com",
-    "title": "Site Title",
-    "confidence": 8,
-    "reason": "Brief explanation of why this site is valuable",
-    "expected_content": "What specific information you expect to find",
-    "original_index": 2
-  }}
-]
-
-Only include sites with confidence score >= 6. Limit to maximum {max_sites} sites.
-"""
+        return _ANALYSIS_PROMPT_TEMPLATE.substitute(query=query, formatted_results=formatted_results, max_sites=max_sites)
     
-    def _format_search_results(self, search_results: List[Dict[str, Any]]) -> str:
+    def _format_search_results(self, search_results: List[Dict[str, Any]], indices: Optional[List[int]] = None) -> str:
         """
         Format search results for LLM analysis.
         
         Args:
             search_results: List of search results
+            indices: Indices of the results to include (default: all)
             
         Returns:
             Formatted string for LLM
         """
-        formatted = ""
-        for i, result in enumerate(search_results, 1):
+        if indices is None:
+            indices = range(len(search_results))
+        parts = []
+        for i in indices:
+            result = search_results[i]
             if "error" in result:
                 continue
                 
@@ -233,13 +662,53 @@ Only include sites with confidence score >= 6. Limit to maximum {max_sites} site
             link = result.get("link", "No link")
             snippet = result.get("snippet", "No snippet")
             
-            formatted += f"{i}. {title}\n"
-            formatted += f"   URL: {link}\n"
-            formatted += f"   Snippet: {snippet}\n\n"
+            parts.append(f"{i + 1}. {title}\n   URL: {link}\n   Snippet: {snippet}\n\n")
+        
+        return "".join(parts)
+    
+    def _local_selection(self, query: str, search_results: List[Dict[str, Any]], max_sites: int) -> Optional[List[SelectedSite]]:
+        """
+        Rank search results locally with BM25, if the ranking is unambiguous.
+        
+        Args:
+            query: The search query
+            search_results: List of search results
+            max_sites: Maximum number of sites to select
+            
+        Returns:
+            List of selected sites, or None if the LLM should decide
+        """
+        candidates = [i for i, result in enumerate(search_results) if "error" not in result]
+        if not candidates:
+            return None
+        scores = _bm25_scores(query, [
+            f"{search_results[i].get('title') or ''} {search_results[i].get('snippet') or ''}" for i in candidates
+        ])
+        top_score = max(scores)
+        if top_score <= 0:
+            return None
+        
+        ranked = sorted(zip(candidates, (score / top_score for score in scores)), key=lambda item: item[1], reverse=True)
+        selected = [(i, score) for i, score in ranked[:max_sites] if score > 0]
+        if not selected:
+            return None
+        # Ambiguous if the last selected result barely beats the best one left out
+        if len(ranked) > len(selected) and selected[-1][1] - ranked[len(selected)][1] < self.local_margin:
+            return None
         
-        return formatted
+        return [
+            SelectedSite(
+                url=search_results[i].get('link', ''),
+                title=search_results[i].get('title', 'Unknown'),
+                confidence=max(1, round(10 * score)),
+                reason='Ranked locally by keyword relevance to the query',
+                expected_content='General information about the topic',
+                original_index=i
+            )
+            for i, score in selected
+        ]
     
-    def _fallback_selection(self, search_results: List[Dict[str, Any]], max_sites: int) -> List[Dict[str, Any]]:
+    def _fallback_selection(self, search_results: List[Dict[str, Any]], max_sites: int) -> List[SelectedSite]:
         """
         Fallback selection when LLM analysis fails.
         
@@ -253,17 +722,17 @@ Only include sites with confidence score >= 6. Limit to maximum {max_sites} site
         selected = []
         for i, result in enumerate(search_results[:max_sites]):
             if "error" not in result:
-                selected.append({
-                    'url': result.get('link', ''),
-                    'title': result.get('title', 'Unknown'),
-                    'confidence': 7,
-                    'reason': 'Fallback selection due to LLM analysis failure',
-                    'expected_content': 'General information about the topic',
-                    'original_index': i
-                })
+                selected.append(SelectedSite(
+                    url=result.get('link', ''),
+                    title=result.get('title', 'Unknown'),
+                    confidence=7,
+                    reason='Fallback selection due to LLM analysis failure',
+                    expected_content='General information about the topic',
+                    original_index=i
+                ))
         return selected
     
-    def analyze_selection_patterns(self, query: str, search_results: List[Dict[str, Any]], selected_sites: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_selection_patterns(self, query: str, search_results: List[Dict[str, Any]], selected_sites: List[SelectedSite]) -> Dict[str, Any]:
         """
         Analyze patterns in the LLM's site selection.
         
@@ -275,31 +744,25 @@ Only include sites with confidence score >= 6. Limit to maximum {max_sites} site
         Returns:
             Analysis of selection patterns
         """
+        # Analyze common reasons: each key phrase counts once per site, found in one regex pass
+        common_reasons = Counter()
+        for site in selected_sites:
+            common_reasons.update(dict.fromkeys(_KEY_PHRASE_RE.findall(site.reason.lower()), 1))
+        
+        # Confidence column, gathered once and shared by all confidence statistics
+        confidences = [s.confidence for s in selected_sites]
+        n_selected = len(confidences)
         analysis = {
             'query': query,
             'total_results': len(search_results),
-            'selected_count': len(selected_sites),
-            'selection_rate': len(selected_sites) / len(search_results) if search_results else 0,
-            'average_confidence': sum(s.get('confidence', 0) for s in selected_sites) / len(selected_sites) if selected_sites else 0,
-            'confidence_distribution': {},
-            'common_reasons': {},
-            'selected_indices': [s.get('original_index', -1) for s in selected_sites]
+            'selected_count': n_selected,
+            'selection_rate': n_selected / len(search_results) if search_results else 0,
+            'average_confidence': statistics.fmean(confidences) if confidences else 0,
+            'confidence_distribution': dict(Counter(confidences)),
+            'common_reasons': dict(common_reasons),
+            'selected_indices': [s.original_index for s in selected_sites]
         }
         
-        # Analyze confidence distribution
-        for site in selected_sites:
-            confidence = site.get('confidence', 0)
-            analysis['confidence_distribution'][confidence] = analysis['confidence_distribution'].get(confidence, 0) + 1
-        
-        # Analyze common reasons
-        for site in selected_sites:
-            reason = site.get('reason', '').lower()
-            # Extract key phrases from reasons
-            key_phrases = ['official', 'authoritative', 'comprehensive', 'detailed', 'latest', 'recent', 'expert', 'reputable']
-            for phrase in key_phrases:
-                if phrase in reason:
-                    analysis['common_reasons'][phrase] = analysis['common_reasons'].get(phrase, 0) + 1
-        
         return analysis
 
 
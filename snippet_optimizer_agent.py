@@ -6,22 +6,95 @@ This agent takes a search query, the full list of search results (including the
 """
 
 import os
-import json
+import re
+import string
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import sys
 
 # Import OpenAI client
 from openai_client_with_mcp import OpenAIClientWithMCP, OpenAIError
+from site_selector_agent import SelectedSite, SiteSelectorAgent, prefilter_results
+import json_compat
+
+# Markdown code block wrapper that LLMs sometimes put around JSON answers
+_CODEBLOCK_RE = re.compile(r"^```(?:json)?\s*([\s\S]*?)\s*```\Z", re.IGNORECASE)
+
+# Directions used to diversify the candidate entries generated in one round
+_CANDIDATE_HINTS = (
+    "Emphasize how directly the entry answers the exact query wording.",
+    "Emphasize authority, credentials and trust signals.",
+    "Emphasize concrete, specific facts and details.",
+    "Emphasize what makes the company unique compared to the other results.",
+)
+
+# Static optimization prompt; filled in with the query, formatted context and company info
+_OPTIMIZATION_PROMPT_TEMPLATE = string.Template("""
+You are an expert at optimizing search result snippets to maximize their selection by an LLM-based site selector.
+
+The following search was performed for: "${query}"
+
+Here are the search results (including a special MCP Test Entry at index ${mcp_entry_index}):
+
+${formatted_results}
+
+The site selector LLM was asked to select the most valuable sites. Here are the sites it selected and its reasoning:
+
+${formatted_selection}
+
+You may ONLY use information from the following company info file. All content you generate must be truthful and based on this file:
+
+---
+${company_info}
+---
+
+Your task:
+- Analyze why the MCP Test Entry at index ${mcp_entry_index} was or was not selected.
+- Propose a new version of the MCP Test Entry (title, snippet, and link) that is more likely to be selected by the site selector LLM for this query.
+- Make the snippet as relevant, authoritative, and appealing as possible for the query.
+- Respond ONLY with a valid JSON object with keys: title, snippet, link, and a brief reason for your changes (reason_for_change).
+
+Example response format:
+{
+  "title": "...",
+  "snippet": "...",
+  "link": "...",
+  "reason_for_change": "..."
+}
+""")
 
 class SnippetOptimizerAgent:
     """Agent that optimizes the MCP Test Entry snippet/title to maximize selection by the site selector."""
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(self, openai_api_key: Optional[str] = None, openai_client: Optional[OpenAIClientWithMCP] = None):
         load_dotenv()
-        self.openai_client = OpenAIClientWithMCP(
+        self.openai_client = openai_client or OpenAIClientWithMCP(
             api_key=openai_api_key,
             mcp_url="http://localhost:8000"
         )
+        # Company info contents by path, with the mtime they were read at
+        self._company_info_cache: Dict[str, tuple] = {}
+
+    def _read_company_info(self, company_info_path: str) -> str:
+        """
+        Return the company info file contents, re-reading only when the file changes.
+        Args:
+            company_info_path: Path to the company info markdown file
+        Returns:
+            File contents, or an empty string if the file cannot be read
+        """
+        try:
+            mtime = os.stat(company_info_path).st_mtime_ns
+            cached = self._company_info_cache.get(company_info_path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            with open(company_info_path, "r", encoding="utf-8") as f:
+                company_info = f.read()
+            self._company_info_cache[company_info_path] = (mtime, company_info)
+            return company_info
+        except Exception as e:
+            print(f"❌ Failed to read company info file: {e}")
+            return ""
 
     def optimize_snippet(
         self,
@@ -30,7 +103,8 @@ class SnippetOptimizerAgent:
         selector_output: Dict[str, Any],
         mcp_entry_index: int = 0,
         debug: bool = False,
-        company_info_path: str = "company_info.md"
+        company_info_path: str = "company_info.md",
+        variant_hint: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Propose a new version of the MCP Test Entry to maximize its selection likelihood.
@@ -41,25 +115,25 @@ class SnippetOptimizerAgent:
             mcp_entry_index: Index of the MCP Test Entry in search_results
             debug: Print debug info
             company_info_path: Path to the company info markdown file
+            variant_hint: Optional extra direction for this particular proposal
         Returns:
-            Dict with new MCP Test Entry, reasoning, and LLM output
+            Dict with new MCP Test Entry, the prompt, reasoning, and LLM output
         """
         mcp_entry = search_results[mcp_entry_index]
         selected_sites = selector_output.get('selected_sites', [])
         
-        # Read company info file
-        try:
-            with open(company_info_path, "r", encoding="utf-8") as f:
-                company_info = f.read()
-        except Exception as e:
-            print(f"❌ Failed to read company info file: {e}")
-            company_info = ""
+        # Read company info file (cached across rounds)
+        company_info = self._read_company_info(company_info_path)
         
-        # Format context for LLM
-        formatted_results = self._format_search_results(search_results)
+        # Format context for LLM, keeping only the locally top-ranked results
+        formatted_results = self._format_search_results(
+            search_results, prefilter_results(query, search_results, keep_indices=[mcp_entry_index])
+        )
         formatted_selection = self._format_selected_sites(selected_sites)
         
         prompt = self._create_optimization_prompt(query, formatted_results, formatted_selection, mcp_entry, mcp_entry_index, company_info)
+        if variant_hint:
+            prompt += f"\nAdditional direction for this proposal: {variant_hint}\n"
         
         if debug:
             print("\n📝 Optimization Prompt:")
@@ -81,16 +155,17 @@ class SnippetOptimizerAgent:
             llm_response = response['choices'][0]['message']['content']
             if debug:
                 print(f"\n🤖 Raw LLM Response:\n{llm_response}\n{'='*50}")
-            # Robustly strip markdown code block wrappers if present
-            import re
+            # Robustly strip markdown code block wrappers if present; bare JSON skips the regex
             cleaned_response = llm_response.strip()
-            codeblock_match = re.match(r"^```(?:json)?\s*([\s\S]*?)\s*```$", cleaned_response, re.IGNORECASE)
-            if codeblock_match:
-                cleaned_response = codeblock_match.group(1).strip()
+            if cleaned_response[:1] not in ('{', '['):
+                codeblock_match = _CODEBLOCK_RE.match(cleaned_response)
+                if codeblock_match:
+                    cleaned_response = codeblock_match.group(1).strip()
             cleaned_response = cleaned_response.strip('`\n ')
-            new_entry = json.loads(cleaned_response)
+            new_entry = json_compat.loads(cleaned_response)
             return {
                 'new_entry': new_entry,
+                'prompt': prompt,
                 'raw_llm_response': llm_response,
                 'success': True,
                 'error': None
@@ -99,66 +174,102 @@ class SnippetOptimizerAgent:
             print(f"❌ Snippet optimization failed: {e}")
             return {
                 'new_entry': None,
+                'prompt': prompt,
                 'raw_llm_response': None,
                 'success': False,
                 'error': str(e)
             }
 
-    def _create_optimization_prompt(self, query, formatted_results, formatted_selection, mcp_entry, mcp_entry_index, company_info):
-        return f"""
-You are an expert at optimizing search result snippets to maximize their selection by an LLM-based site selector.
-
-The following search was performed for: "{query}"
-
-Here are the search results (including a special MCP Test Entry at index {mcp_entry_index}):
-
-{formatted_results}
-
-The site selector LLM was asked to select the most valuable sites. Here are the sites it selected and its reasoning:
-
-{formatted_selection}
-
-You may ONLY use information from the following company info file. All content you generate must be truthful and based on this file:
-
----
-{company_info}
----
-
-Your task:
-- Analyze why the MCP Test Entry at index {mcp_entry_index} was or was not selected.
-- Propose a new version of the MCP Test Entry (title, snippet, and link) that is more likely to be selected by the site selector LLM for this query.
-- Make the snippet as relevant, authoritative, and appealing as possible for the query.
-- Respond ONLY with a valid JSON object with keys: title, snippet, link, and a brief reason for your changes (reason_for_change).
+    def optimize_snippet_candidates(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        selector_output: Dict[str, Any],
+        mcp_entry_index: int = 0,
+        num_candidates: int = 4,
+        company_info_path: str = "company_info.md",
+        debug: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Propose several differently-angled MCP Test Entry versions concurrently.
+        Args:
+            query: The search query
+            search_results: List of all search results (including MCP Test Entry)
+            selector_output: Output from the site selector (selected_sites, reasons, etc.)
+            mcp_entry_index: Index of the MCP Test Entry in search_results
+            num_candidates: Number of proposals to request (at most one per hint)
+            company_info_path: Path to the company info markdown file
+            debug: Print each prompt and raw LLM response, in hint order
+        Returns:
+            List of successfully proposed entries, in hint order
+        """
+        hints = _CANDIDATE_HINTS[:num_candidates]
+        with ThreadPoolExecutor(max_workers=len(hints)) as executor:
+            results = list(executor.map(
+                lambda hint: self.optimize_snippet(
+                    query, search_results, selector_output, mcp_entry_index,
+                    company_info_path=company_info_path, variant_hint=hint
+                ),
+                hints
+            ))
+        if debug:
+            # Printed after the concurrent calls finish so the proposals do not interleave
+            for i, result in enumerate(results, 1):
+                print(f"\n📝 Optimization Prompt (candidate {i}):")
+                print("=" * 50)
+                print(result['prompt'])
+                print("=" * 50)
+                if result['raw_llm_response'] is not None:
+                    print(f"\n🤖 Raw LLM Response (candidate {i}):\n{result['raw_llm_response']}\n{'='*50}")
+        return [result['new_entry'] for result in results if result['success']]
 
-Example response format:
-{{
-  "title": "...",
-  "snippet": "...",
-  "link": "...",
-  "reason_for_change": "..."
-}}
-"""
+    def _create_optimization_prompt(self, query, formatted_results, formatted_selection, mcp_entry, mcp_entry_index, company_info):
+        return _OPTIMIZATION_PROMPT_TEMPLATE.substitute(
+            query=query,
+            formatted_results=formatted_results,
+            formatted_selection=formatted_selection,
+            mcp_entry_index=mcp_entry_index,
+            company_info=company_info
+        )
 
-    def _format_search_results(self, search_results: List[Dict[str, Any]]) -> str:
-        formatted = ""
-        for i, result in enumerate(search_results):
+    def _format_search_results(self, search_results: List[Dict[str, Any]], indices: Optional[List[int]] = None) -> str:
+        if indices is None:
+            indices = range(len(search_results))
+        parts = []
+        for i in indices:
+            result = search_results[i]
             if "error" in result:
                 continue
             title = result.get("title", "No title")
             link = result.get("link", "No link")
             snippet = result.get("snippet", "No snippet")
-            formatted += f"[{i}] {title}\n   URL: {link}\n   Snippet: {snippet}\n\n"
-        return formatted
+            parts.append(f"[{i}] {title}\n   URL: {link}\n   Snippet: {snippet}\n\n")
+        return "".join(parts)
+
+    def _format_selected_sites(self, selected_sites: List[SelectedSite]) -> str:
+        return "".join(
+            f"{i}. {site.title}\n   URL: {site.url}\n   Confidence: {site.confidence}/10\n   Reason: {site.reason}\n\n"
+            for i, site in enumerate(selected_sites, 1)
+        )
+
+
+def _apply_entry(search_results: List[Dict[str, Any]], mcp_entry_index: int, new_entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return a copy of search_results with the MCP Test Entry replaced by new_entry."""
+    updated = [dict(r) for r in search_results]
+    entry = updated[mcp_entry_index]
+    for key in ('title', 'snippet', 'link'):
+        entry[key] = new_entry.get(key, entry.get(key))
+    return updated
+
 
-    def _format_selected_sites(self, selected_sites: List[Dict[str, Any]]) -> str:
-        formatted = ""
-        for i, site in enumerate(selected_sites, 1):
-            title = site.get("title", "No title")
-            url = site.get("url", "No url")
-            confidence = site.get("confidence", "?")
-            reason = site.get("reason", "No reason")
-            formatted += f"{i}. {title}\n   URL: {url}\n   Confidence: {confidence}/10\n   Reason: {reason}\n\n"
-        return formatted
+def _find_selected_entry(selector_output: Dict[str, Any], search_results: List[Dict[str, Any]], mcp_entry_index: int) -> Optional[SelectedSite]:
+    """Return the selected site matching the MCP Test Entry by index, title, or URL, if any."""
+    mcp_title = search_results[mcp_entry_index].get('title', '')
+    mcp_url = search_results[mcp_entry_index].get('link', '')
+    for s in selector_output.get('selected_sites', []):
+        if s.original_index == mcp_entry_index or s.title == mcp_title or s.url == mcp_url:
+            return s
+    return None
 
 
 def main():
@@ -167,9 +278,8 @@ def main():
     if not os.getenv("OPENAI_API_KEY"):
         print("❌ Error: OPENAI_API_KEY not found!")
         return
-    from site_selector_agent import SiteSelectorAgent
     agent = SiteSelectorAgent()
-    optimizer = SnippetOptimizerAgent()
+    optimizer = SnippetOptimizerAgent(openai_client=agent.openai_client)
     # Accept query as command-line argument or prompt
     if len(sys.argv) > 1:
         query = " ".join(sys.argv[1:]).strip()
@@ -185,66 +295,85 @@ def main():
             mcp_entry_index = i
             break
     max_rounds = 10
+    # Candidates are scored with a cheap pairwise check against the last full
+    # selection, re-anchored with a full site selector run every few rounds
+    full_selection_every = 3
+    print(f"🧠 Running site selector...")
+    selector_output = agent.select_sites(query, search_results, max_sites=3, debug=False, keep_indices=[mcp_entry_index])
+    anchor_sites = selector_output.get('selected_sites', [])
+    # Whether selector_output comes from a full site selector run (not a pairwise check)
+    full_selection = True
     for round_num in range(1, max_rounds + 1):
         print(f"\n=== OPTIMIZATION ROUND {round_num} ===")
-        print(f"🧠 Running site selector...")
-        selector_output = agent.select_sites(query, search_results, max_sites=3, debug=False)
-        selected_indices = [s.get('original_index', -1) for s in selector_output.get('selected_sites', [])]
-        selected_titles = [s.get('title', '') for s in selector_output.get('selected_sites', [])]
-        selected_urls = [s.get('url', '') for s in selector_output.get('selected_sites', [])]
-        print("Selected indices:", selected_indices)
-        print("Selected titles:", selected_titles)
-        print("Selected URLs:", selected_urls)
-        mcp_title = search_results[mcp_entry_index].get('title', '')
-        mcp_url = search_results[mcp_entry_index].get('link', '')
+        selected_sites = selector_output.get('selected_sites', [])
+        print("Selected indices:", [s.original_index for s in selected_sites])
+        print("Selected titles:", [s.title for s in selected_sites])
+        print("Selected URLs:", [s.url for s in selected_sites])
         # Check by index, title, or URL
-        selected = False
-        if mcp_entry_index in selected_indices:
-            selected = True
-        elif any(mcp_title == t for t in selected_titles):
-            selected = True
-        elif any(mcp_url == u for u in selected_urls):
-            selected = True
-        if selected:
+        s = _find_selected_entry(selector_output, search_results, mcp_entry_index)
+        if s is not None and not full_selection:
+            # A pairwise yes must be confirmed by a full ranking before optimizing the website
+            print("🧠 Pairwise check selected the entry; confirming with a full site selector run...")
+            selector_output = agent.select_sites(query, search_results, max_sites=3, debug=False, keep_indices=[mcp_entry_index])
+            anchor_sites = selector_output.get('selected_sites', [])
+            full_selection = True
+            s = _find_selected_entry(selector_output, search_results, mcp_entry_index)
+            if s is None:
+                print("⚠️  Full site selector run did not confirm the selection.")
+        if s is not None:
             print(f"🎉 MCP Test Entry SELECTED in round {round_num}!")
-            for s in selector_output['selected_sites']:
-                if (
-                    s.get('original_index', -1) == mcp_entry_index or
-                    s.get('title', '') == mcp_title or
-                    s.get('url', '') == mcp_url
-                ):
-                    print(json.dumps(s, indent=2))
-                    # Robustly write the selected snippet to target_snippet.txt
-                    snippet_text = s.get('snippet') or s.get('expected_content') or ''
-                    if not snippet_text:
-                        # Fallback: use the snippet from the MCP Test Entry in search_results
-                        mcp_snippet = search_results[mcp_entry_index].get('snippet', '')
-                        print("WARNING: No snippet found in selected site. Falling back to MCP Test Entry snippet:", mcp_snippet)
-                        snippet_text = mcp_snippet
-                    else:
-                        print("Selected snippet to write:", snippet_text)
-                    with open("target_snippet.txt", "w", encoding="utf-8") as f:
-                        f.write(snippet_text)
-                    print("\n🚀 Invoking website_optimizer_agent.py to propose website changes...")
-                    import subprocess
-                    subprocess.run(["python", "website_optimizer_agent.py"])
+            print(json_compat.dumps_pretty(s.to_dict()))
+            # Robustly write the selected snippet to target_snippet.txt
+            snippet_text = s.expected_content or ''
+            if not snippet_text:
+                # Fallback: use the snippet from the MCP Test Entry in search_results
+                mcp_snippet = search_results[mcp_entry_index].get('snippet', '')
+                print("WARNING: No snippet found in selected site. Falling back to MCP Test Entry snippet:", mcp_snippet)
+                snippet_text = mcp_snippet
+            else:
+                print("Selected snippet to write:", snippet_text)
+            with open("target_snippet.txt", "w", encoding="utf-8") as f:
+                f.write(snippet_text)
+            print("\n🚀 Invoking website optimizer agent to propose website changes...")
+            # Imported here so the optimizer (and bs4) are only loaded when needed
+            from website_optimizer_agent import main as website_optimizer_main
+            website_optimizer_main(target_snippet=snippet_text.strip())
+            break
+        print(f"❌ MCP Test Entry NOT selected. Optimizing...")
+        candidates = optimizer.optimize_snippet_candidates(query, search_results, selector_output, mcp_entry_index, debug=True)
+        if not candidates:
+            print("❌ Optimization failed: no candidate entries were proposed")
             break
+        print(f"✅ {len(candidates)} new MCP Test Entry candidates proposed:")
+        for new_entry in candidates:
+            print(json_compat.dumps_pretty(new_entry))
+        # Score all candidates at once; keep the first one that gets selected,
+        # otherwise carry the first candidate into the next round
+        candidate_results = [_apply_entry(search_results, mcp_entry_index, new_entry) for new_entry in candidates]
+        if round_num % full_selection_every == 0:
+            print(f"🧠 Running site selector on {len(candidates)} candidates...")
+            candidate_outputs = agent.select_sites_batch(
+                [(query, results) for results in candidate_results], max_sites=3,
+                keep_indices=[mcp_entry_index]
+            )
         else:
-            print(f"❌ MCP Test Entry NOT selected. Optimizing...")
-            result = optimizer.optimize_snippet(query, search_results, selector_output, mcp_entry_index, debug=True)
-            if result['success']:
-                new_entry = result['new_entry']
-                print("✅ New MCP Test Entry proposed:")
-                print(json.dumps(new_entry, indent=2))
-                # Replace MCP Test Entry in search results
-                search_results[mcp_entry_index]['title'] = new_entry.get('title', search_results[mcp_entry_index]['title'])
-                search_results[mcp_entry_index]['snippet'] = new_entry.get('snippet', search_results[mcp_entry_index]['snippet'])
-                search_results[mcp_entry_index]['link'] = new_entry.get('link', search_results[mcp_entry_index]['link'])
-            else:
-                print(f"❌ Optimization failed: {result['error']}")
-                break
+            print(f"⚖️  Checking {len(candidates)} candidates against the current top sites...")
+            with ThreadPoolExecutor(max_workers=len(candidate_results)) as executor:
+                candidate_outputs = list(executor.map(
+                    lambda results: agent.would_select(query, anchor_sites, results[mcp_entry_index], mcp_entry_index),
+                    candidate_results
+                ))
+        best = next(
+            (i for i, output in enumerate(candidate_outputs)
+             if _find_selected_entry(output, candidate_results[i], mcp_entry_index) is not None),
+            0
+        )
+        search_results, selector_output = candidate_results[best], candidate_outputs[best]
+        full_selection = round_num % full_selection_every == 0
+        if full_selection:
+            anchor_sites = selector_output.get('selected_sites', [])
     else:
         print(f"⚠️  Reached max rounds ({max_rounds}) and MCP Test Entry was not selected.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -5,6 +5,13 @@ Test script to check what endpoints are actually available on the server.
 
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# Shared keep-alive session for all probes; sized so the concurrent probes
+# each get a pooled connection instead of opening a fresh one per call
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0))
 
 def test_endpoints():
     """Test various endpoint patterns to see what works."""
@@ -13,77 +20,54 @@ def test_endpoints():
     print("🔍 Testing MCP endpoints...")
     print("=" * 40)
     
-    # Test 1: Check if server is running
-    try:
-        response = requests.get(f"{base_url}/")
-        print(f"✅ Root endpoint: {response.status_code}")
-        print(f"   Response: {response.json()}")
-    except Exception as e:
-        print(f"❌ Root endpoint failed: {e}")
-    
-    # Test 2: Check health endpoint
-    try:
-        response = requests.get(f"{base_url}/health")
-        print(f"✅ Health endpoint: {response.status_code}")
-        print(f"   Response: {response.json()}")
-    except Exception as e:
-        print(f"❌ Health endpoint failed: {e}")
-    
-    # Test 3: Check MCP tools endpoint
-    try:
-        response = requests.get(f"{base_url}/mcp/tools")
-        print(f"✅ MCP tools endpoint: {response.status_code}")
-        print(f"   Response: {response.text}")
-    except Exception as e:
-        print(f"❌ MCP tools endpoint failed: {e}")
-    
-    # Test 4: Check MCP tools list
-    try:
-        response = requests.get(f"{base_url}/mcp/tools/list")
-        print(f"✅ MCP tools list endpoint: {response.status_code}")
-        print(f"   Response: {response.text}")
-    except Exception as e:
-        print(f"❌ MCP tools list endpoint failed: {e}")
+    mcp_request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {
+            "name": "search_web",
+            "arguments": {
+                "query": "test",
+                "num_results": 1
+            }
+        }
+    }
     
-    # Test 5: Check MCP tools call endpoint
-    try:
-        response = requests.post(f"{base_url}/mcp/tools/call", 
-                               json={"name": "search_web", "arguments": {"query": "test"}})
-        print(f"✅ MCP tools call endpoint: {response.status_code}")
-        print(f"   Response: {response.text}")
-    except Exception as e:
-        print(f"❌ MCP tools call endpoint failed: {e}")
+    # (label, method, path, request kwargs, show JSON body instead of raw text)
+    probes = [
+        # Test 1: Check if server is running
+        ("Root endpoint", "GET", "/", {}, True),
+        # Test 2: Check health endpoint
+        ("Health endpoint", "GET", "/health", {}, True),
+        # Test 3: Check MCP tools endpoint
+        ("MCP tools endpoint", "GET", "/mcp/tools", {}, False),
+        # Test 4: Check MCP tools list
+        ("MCP tools list endpoint", "GET", "/mcp/tools/list", {}, False),
+        # Test 5: Check MCP tools call endpoint
+        ("MCP tools call endpoint", "POST", "/mcp/tools/call",
+         {"json": {"name": "search_web", "arguments": {"query": "test"}}}, False),
+        # Test 6: Check the specific search_web endpoint
+        ("Search web endpoint", "POST", "/mcp/tools/search_web",
+         {"json": {"query": "test", "num_results": 1}}, False),
+        # Test 7: Check with proper MCP format
+        ("MCP tools call with proper format", "POST", "/mcp/tools/call",
+         {"json": mcp_request, "headers": {"Content-Type": "application/json"}}, False),
+    ]
     
-    # Test 6: Check the specific search_web endpoint
-    try:
-        response = requests.post(f"{base_url}/mcp/tools/search_web", 
-                               json={"query": "test", "num_results": 1})
-        print(f"✅ Search web endpoint: {response.status_code}")
-        print(f"   Response: {response.text}")
-    except Exception as e:
-        print(f"❌ Search web endpoint failed: {e}")
+    # The probes are independent, so issue them all at once and report in order
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = [
+            executor.submit(_SESSION.request, method, f"{base_url}{path}", timeout=2, **kwargs)
+            for _, method, path, kwargs, _ in probes
+        ]
     
-    # Test 7: Check with proper MCP format
-    try:
-        mcp_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": "search_web",
-                "arguments": {
-                    "query": "test",
-                    "num_results": 1
-                }
-            }
-        }
-        response = requests.post(f"{base_url}/mcp/tools/call", 
-                               json=mcp_request,
-                               headers={"Content-Type": "application/json"})
-        print(f"✅ MCP tools call with proper format: {response.status_code}")
-        print(f"   Response: {response.text}")
-    except Exception as e:
-        print(f"❌ MCP tools call with proper format failed: {e}")
+    for (label, _, _, _, show_json), future in zip(probes, futures):
+        try:
+            response = future.result()
+            print(f"✅ {label}: {response.status_code}")
+            print(f"   Response: {response.json() if show_json else response.text}")
+        except Exception as e:
+            print(f"❌ {label} failed: {e}")
 
 if __name__ == "__main__":
-    test_endpoints() 
\ No newline at end of file
+    test_endpoints()
@@ -5,10 +5,90 @@ Test script for the Intelligent Search Tool.
 
 import os
 import sys
-from dotenv import load_dotenv
+import pickle
+from typing import Final, Tuple
+from env_config import OPENAI_API_KEY
 
 # Import the intelligent search tool
 from intelligent_search_tool import IntelligentSearchTool
+from embeddings import cosine_similarity, embed_text
+from mcp_health import check_mcp_health
+from openai_client_with_mcp import OpenAIError
+from openai_singleton import get_openai
+
+# Queries exercised by the tests
+TEST_QUERIES: Final[Tuple[str, ...]] = (
+    "What is machine learning?",
+    "Python programming basics",
+    "OpenAI GPT features"
+)
+
+
+class SemanticCache:
+    """
+    On-disk cache of intelligent_search results, keyed by query embedding.
+    
+    Wraps an IntelligentSearchTool; a result is reused when a query with the same
+    max_sites has an embedding within ``threshold`` cosine similarity of a cached one.
+    Cached results never expire, so the cache is opt-in: set INTELLIGENT_SEARCH_CACHE=1
+    to enable it (and delete the cache directory to refresh it).
+    """
+    
+    def __init__(self, tool: IntelligentSearchTool, cache_dir: str = ".intelligent_search_cache", threshold: float = 0.92):
+        """
+        Load the cached entries from disk.
+        
+        Args:
+            tool: The intelligent search tool to wrap
+            cache_dir: Directory the cache file is stored in
+            threshold: Minimum cosine similarity for a cache hit
+        """
+        self.tool = tool
+        self.path = os.path.join(cache_dir, "entries.pkl")
+        self.threshold = threshold
+        try:
+            with open(self.path, "rb") as f:
+                self._entries = pickle.load(f)  # [(max_sites, embedding, result)]
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._entries = []
+    
+    def intelligent_search(self, query: str, max_sites: int = 5):
+        """
+        Return the cached result for a similar query, or run the search and cache it.
+        
+        Args:
+            query: The search query
+            max_sites: Maximum number of sites to visit
+            
+        Returns:
+            The intelligent_search result dictionary
+        """
+        try:
+            embedding = embed_text(self.tool.openai_client, query)
+        except OpenAIError as e:
+            print(f"⚠️  Query embedding failed, skipping cache: {e}")
+            return self.tool.intelligent_search(query, max_sites=max_sites)
+        
+        best, best_score = None, self.threshold
+        for cached_max_sites, cached_embedding, result in self._entries:
+            if cached_max_sites != max_sites:
+                continue
+            score = cosine_similarity(embedding, cached_embedding)
+            if score >= best_score:
+                best, best_score = result, score
+        if best is not None:
+            print(f"⚡ Reusing cached result for '{query}' (similarity {best_score:.3f})")
+            return best
+        
+        result = self.tool.intelligent_search(query, max_sites=max_sites)
+        if result.get('success'):
+            self._entries.append((max_sites, embedding, result))
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        return result
 
 
 def test_intelligent_search():
@@ -17,64 +97,60 @@ def test_intelligent_search():
     print("🧪 Testing Intelligent Search Tool")
     print("=" * 50)
     
-    # Load environment variables
-    load_dotenv()
-    
     # Check for OpenAI API key
-    if not os.getenv("OPENAI_API_KEY"):
+    if not OPENAI_API_KEY:
         print("❌ Error: OPENAI_API_KEY not found!")
         print("Please set your OpenAI API key in your .env file")
         return False
     
     # Initialize the tool
     try:
-        tool = IntelligentSearchTool()
+        tool = IntelligentSearchTool(openai_client=get_openai())
         print("✅ Intelligent search tool initialized successfully")
+        if os.getenv("INTELLIGENT_SEARCH_CACHE", "0") == "1":
+            tool = SemanticCache(tool)
     except Exception as e:
         print(f"❌ Failed to initialize tool: {e}")
         return False
     
-    # Test queries
-    test_queries = [
-        "What is machine learning?",
-        "Python programming basics",
-        "OpenAI GPT features"
-    ]
-    
-    for i, query in enumerate(test_queries, 1):
+    # Searches run one at a time, so the tool's progress output stays grouped per query
+    for i, query in enumerate(TEST_QUERIES, 1):
         print(f"\n📋 Test {i}: '{query}'")
         print("-" * 40)
         
+        # Collect this query's report and write it in one go
+        lines = []
+        
         try:
-            # Perform intelligent search
             results = tool.intelligent_search(query, max_sites=2)
             
             if results.get('success'):
-                print("✅ Intelligent search completed successfully!")
+                lines.append("✅ Intelligent search completed successfully!")
                 
                 # Show statistics
-                initial_count = len(results.get('initial_results', []))
-                selected_count = len(results.get('selected_sites', []))
-                extracted_count = len([c for c in results.get('extracted_content', []) if c.get('extraction_success')])
+                initial_count = len(results.get('initial_results', ()))
+                selected_count = len(results.get('selected_sites', ()))
+                extracted_count = sum(1 for c in results.get('extracted_content', ()) if c.get('extraction_success'))
                 
-                print(f"📊 Statistics:")
-                print(f"   • Initial results: {initial_count}")
-                print(f"   • Sites selected by LLM: {selected_count}")
-                print(f"   • Content extracted: {extracted_count}")
+                lines.append(f"📊 Statistics:")
+                lines.append(f"   • Initial results: {initial_count}")
+                lines.append(f"   • Sites selected by LLM: {selected_count}")
+                lines.append(f"   • Content extracted: {extracted_count}")
                 
                 # Show summary preview
                 summary = results.get('summary', '')
                 if summary:
                     preview = summary[:200] + "..." if len(summary) > 200 else summary
-                    print(f"📝 Summary preview: {preview}")
+                    lines.append(f"📝 Summary preview: {preview}")
                 
             else:
-                print(f"❌ Search failed: {results.get('error', 'Unknown error')}")
+                lines.append(f"❌ Search failed: {results.get('error', 'Unknown error')}")
                 
         except Exception as e:
-            print(f"❌ Error during search: {e}")
+            lines.append(f"❌ Error during search: {e}")
         
-        print()
+        lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
     
     print("✅ All tests completed!")
     return True
@@ -84,22 +160,7 @@ def test_mcp_connection():
     """Test MCP server connection."""
     print("🔗 Testing MCP server connection...")
     
-    try:
-        import requests
-        response = requests.get("http://localhost:8000/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ MCP server is running")
-            return True
-        else:
-            print(f"❌ MCP server responded with status {response.status_code}")
-            return False
-    except requests.exceptions.ConnectionError:
-        print("❌ MCP server is not running")
-        print("Start it with: ./start_openai_mcp.sh")
-        return False
-    except Exception as e:
-        print(f"❌ Error checking MCP server: {e}")
-        return False
+    return check_mcp_health()
 
 
 def main():
@@ -9,7 +9,18 @@ and see the logging in action.
 import requests
 import json
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Final, List, Tuple
+from http_session import retry_after
+import json_compat
+
+
+# Queries exercised by the tests
+TEST_QUERIES: Final[Tuple[str, ...]] = (
+    "OpenAI GPT-4 features",
+    "Python programming tips",
+    "Machine learning basics"
+)
 
 
 class MCPTestClient:
@@ -31,6 +42,46 @@ class MCPTestClient:
         Returns:
             Response from the tool
         """
+        request_data = self._build_request(tool_name, arguments)
+        
+        try:
+            print(f"🔍 Making MCP request to {tool_name}...")
+            print(f"📝 Arguments: {json_compat.dumps_pretty(arguments)}")
+            
+            result = self._send(request_data)
+            
+            print(f"✅ Response received:")
+            print(f"📄 Result: {json_compat.dumps_pretty(result)}")
+            
+            return result
+            
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            print(f"❌ Request failed: {e}")
+            return {"error": str(e)}
+    
+    def call_batch(self, tools_and_args: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Call several MCP tools at once.
+        
+        The server has no batch endpoint, so the calls are sent concurrently
+        over the pooled session.
+        
+        Args:
+            tools_and_args: (tool name, arguments) pairs to call
+            
+        Returns:
+            Responses from the tools, in the same order; failed calls give {"error": ...}
+        """
+        if not tools_and_args:
+            return []
+        
+        # Assign request ids up front so they stay sequential
+        batch = [self._build_request(tool_name, arguments) for tool_name, arguments in tools_and_args]
+        with ThreadPoolExecutor(max_workers=len(batch)) as executor:
+            return list(executor.map(self._send_or_error, batch))
+    
+    def _build_request(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a JSON-RPC tools/call request with the next request id."""
         request_data = {
             "jsonrpc": "2.0",
             "id": self.request_id,
@@ -42,29 +93,37 @@ class MCPTestClient:
         }
         
         self.request_id += 1
+        return request_data
+    
+    def _send(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request and return the parsed response, raising on HTTP or JSON errors."""
+        response = self._post(request_data)
         
+        # Back off only when the server asks us to
+        delay = retry_after(response)
+        if delay:
+            print(f"⏳ Server returned {response.status_code}, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            response = self._post(request_data)
+        
+        response.raise_for_status()
+        return json_compat.loads(response.content)
+    
+    def _send_or_error(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request, returning {"error": ...} instead of raising."""
         try:
-            print(f"🔍 Making MCP request to {tool_name}...")
-            print(f"📝 Arguments: {json.dumps(arguments, indent=2)}")
-            
-            response = self.session.post(
-                f"{self.base_url}/mcp/tools/search_web",
-                json=request_data,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            print(f"✅ Response received:")
-            print(f"📄 Result: {json.dumps(result, indent=2)}")
-            
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Request failed: {e}")
+            return self._send(request_data)
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
             return {"error": str(e)}
     
+    def _post(self, request_data: Dict[str, Any]):
+        """POST an MCP request to the search_web endpoint."""
+        return self.session.post(
+            f"{self.base_url}/mcp/tools/search_web",
+            json=request_data,
+            headers={"Content-Type": "application/json"}
+        )
+    
     def test_search(self, query: str, num_results: int = 3):
         """Test the search_web tool."""
         print(f"\n🧪 Testing search with query: '{query}'")
@@ -86,21 +145,18 @@ def main():
     # Initialize client
     client = MCPTestClient()
     
-    # Test cases
-    test_queries = [
-        "OpenAI GPT-4 features",
-        "Python programming tips",
-        "Machine learning basics"
-    ]
+    # Send all searches in one batch, then report them in order
+    results = client.call_batch([
+        ("search_web", {"query": query, "num_results": 2})
+        for query in TEST_QUERIES
+    ])
     
-    for i, query in enumerate(test_queries, 1):
+    for i, (query, result) in enumerate(zip(TEST_QUERIES, results), 1):
         print(f"\n📋 Test {i}: {query}")
-        result = client.test_search(query, num_results=2)
-        
-        # Wait a bit between requests
-        if i < len(test_queries):
-            print("⏳ Waiting 2 seconds before next test...")
-            time.sleep(2)
+        if "error" in result:
+            print(f"❌ Request failed: {result['error']}")
+        else:
+            print(f"📄 Result: {json_compat.dumps_pretty(result)}")
     
     print("\n✅ All tests completed!")
     print("\n📊 Check the logs with:")
@@ -4,8 +4,50 @@ Test script to verify MCP tool is working with test entries.
 """
 
 import requests
-import json
+import io
 import sys
+import asyncio
+from typing import Final, Tuple
+from http_session import SESSION
+import json_compat
+
+try:
+    import ijson  # Optional streaming JSON parser
+except ImportError:
+    ijson = None
+
+# Test entry titles emitted by the server all start with this marker
+TEST_ENTRY_PREFIX = "🧪"
+TEST_ENTRY_TITLE = "🧪 MCP Test Entry"
+
+# Queries exercised by the tests
+TEST_QUERIES: Final[Tuple[str, ...]] = (
+    "test query",
+    "python programming",
+    "openai gpt",
+    "random search term"
+)
+
+def _extract_search_results(response):
+    """
+    Return the search results embedded in an MCP tool response, or None if it has no text content.
+    
+    With ijson available the (streamed) body is parsed incrementally and only
+    result.content[0].text is pulled out, instead of building the whole response tree.
+    """
+    if ijson is not None:
+        response.raw.decode_content = True
+        text = next(ijson.items(response.raw, "result.content.item.text"), None)
+        if text is None:
+            return None
+        return list(ijson.items(io.BytesIO(text.encode("utf-8")), "item"))
+    
+    result = json_compat.loads(response.content)
+    try:
+        text = result["result"]["content"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return json_compat.loads(text)
 
 def test_mcp_search():
     """Test the MCP search tool to verify it's working."""
@@ -13,85 +55,62 @@ def test_mcp_search():
     print("🧪 Testing MCP Search Tool")
     print("=" * 40)
     
-    # Test data
-    test_queries = [
-        "test query",
-        "python programming",
-        "openai gpt",
-        "random search term"
-    ]
+    # Send all searches concurrently, then report them in order
+    responses = asyncio.run(_run_searches(TEST_QUERIES))
     
-    for i, query in enumerate(test_queries, 1):
-        print(f"\n📋 Test {i}: '{query}'")
-        print("-" * 30)
-        
-        # Make request to MCP server
-        request_data = {
-            "jsonrpc": "2.0",
-            "id": i,
-            "method": "tools/call",
-            "params": {
-                "name": "search_web",
-                "arguments": {
-                    "query": query,
-                    "num_results": 3
-                }
-            }
-        }
+    for i, (query, response) in enumerate(zip(TEST_QUERIES, responses), 1):
+        # Collect this query's report and write it in one go
+        lines = [f"\n📋 Test {i}: '{query}'", "-" * 30]
         
         try:
-            response = requests.post(
-                "http://localhost:8000/mcp/tools/search_web",
-                json=request_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
+            if isinstance(response, Exception):
+                raise response
             
             if response.status_code == 200:
-                result = response.json()
+                search_results = _extract_search_results(response)
                 
                 # Parse the results
-                if "result" in result and "content" in result["result"]:
-                    content = result["result"]["content"]
-                    if content and len(content) > 0 and "text" in content[0]:
-                        search_results = json.loads(content[0]["text"])
-                        
-                        print(f"✅ Success! Found {len(search_results)} results:")
-                        
-                        for j, result_item in enumerate(search_results, 1):
-                            if "error" in result_item:
-                                print(f"  {j}. ❌ Error: {result_item['error']}")
-                            else:
-                                title = result_item.get("title", "No title")
-                                link = result_item.get("link", "No link")
-                                snippet = result_item.get("snippet", "No snippet")
-                                
-                                print(f"  {j}. 📄 {title}")
-                                print(f"     🔗 {link}")
-                                print(f"     📝 {snippet[:100]}{'...' if len(snippet) > 100 else ''}")
-                        
-                        # Check if test entry is present
-                        test_entries = [r for r in search_results if "🧪 MCP Test Entry" in r.get("title", "")]
-                        if test_entries:
-                            print(f"  ✅ Test entry found: {len(test_entries)} test entries")
+                if search_results is not None:
+                    lines.append(f"✅ Success! Found {len(search_results)} results:")
+                    
+                    for j, result_item in enumerate(search_results, 1):
+                        if "error" in result_item:
+                            lines.append(f"  {j}. ❌ Error: {result_item['error']}")
                         else:
-                            print(f"  ⚠️  No test entries found")
+                            title = result_item.get("title", "No title")
+                            link = result_item.get("link", "No link")
+                            snippet = result_item.get("snippet", "No snippet")
+                            
+                            lines.append(f"  {j}. 📄 {title}")
+                            lines.append(f"     🔗 {link}")
+                            lines.append(f"     📝 {snippet[:100]}{'...' if len(snippet) > 100 else ''}")
+                    
+                    # Check if test entry is present
+                    titles = [r.get("title", "") for r in search_results]
+                    test_entries = [
+                        r for r, title in zip(search_results, titles)
+                        if title.startswith(TEST_ENTRY_PREFIX) and TEST_ENTRY_TITLE in title
+                    ]
+                    if test_entries:
+                        lines.append(f"  ✅ Test entry found: {len(test_entries)} test entries")
                     else:
-                        print("❌ Invalid response format")
+                        lines.append(f"  ⚠️  No test entries found")
                 else:
-                    print("❌ No result content in response")
+                    lines.append("❌ Invalid response format: no result content in response")
                     
             else:
-                print(f"❌ HTTP Error: {response.status_code}")
-                print(f"Response: {response.text}")
+                lines.append(f"❌ HTTP Error: {response.status_code}")
+                lines.append(f"Response: {response.text}")
                 
         except requests.exceptions.ConnectionError:
-            print("❌ Connection Error: MCP server not running")
-            print("Start the server with: ./start_openai_mcp.sh")
+            lines.append("❌ Connection Error: MCP server not running")
+            lines.append("Start the server with: ./start_openai_mcp.sh")
         except requests.exceptions.Timeout:
-            print("❌ Timeout: Request took too long")
+            lines.append("❌ Timeout: Request took too long")
         except Exception as e:
-            print(f"❌ Error: {e}")
+            lines.append(f"❌ Error: {e}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     print("\n" + "=" * 40)
     print("🎯 Test Summary:")
@@ -99,10 +118,39 @@ def test_mcp_search():
     print("• Test entries should appear even if Google API is not configured")
     print("• You can now use this with your OpenAI client")
 
+def _post_search(request_id, query):
+    """Send one search_web request to the MCP server."""
+    request_data = {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {
+            "name": "search_web",
+            "arguments": {
+                "query": query,
+                "num_results": 3
+            }
+        }
+    }
+    return SESSION.post(
+        "http://localhost:8000/mcp/tools/search_web",
+        json=request_data,
+        headers={"Content-Type": "application/json"},
+        timeout=10,
+        stream=True
+    )
+
+async def _run_searches(queries):
+    """Post every query in worker threads, returning responses or exceptions in order."""
+    return await asyncio.gather(
+        *(asyncio.to_thread(_post_search, i, query) for i, query in enumerate(queries, 1)),
+        return_exceptions=True
+    )
+
 def test_server_status():
     """Test if the server is running."""
     try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
+        response = SESSION.get("http://localhost:8000/health", timeout=5)
         if response.status_code == 200:
             print("✅ MCP server is running")
             return True
@@ -1,9 +1,13 @@
-import os
-import requests
-from dotenv import load_dotenv
+from itertools import islice
+from env_config import OPENAI_API_KEY
+from http_session import SESSION
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
+try:
+    import ijson  # Optional streaming JSON parser
+except ImportError:
+    ijson = None
+
+api_key = OPENAI_API_KEY
 
 if not api_key:
     print("❌ OPENAI_API_KEY not found!")
@@ -17,11 +21,17 @@ headers = {
 }
 
 try:
-    resp = requests.get("https://api.openai.com/v1/models", headers=headers, timeout=10)
+    resp = SESSION.get("https://api.openai.com/v1/models", headers=headers, timeout=10, stream=True)
     resp.raise_for_status()
-    data = resp.json()
+    if ijson is not None:
+        # Parse only the first few models instead of the whole list
+        resp.raw.decode_content = True
+        models = list(islice(ijson.items(resp.raw, "data.item"), 5))
+    else:
+        models = resp.json().get("data", [])[:5]
+    resp.close()
     print("✅ API key is valid. Models available:")
-    for model in data.get("data", [])[:5]:
+    for model in models:
         print("-", model.get("id"))
 except Exception as e:
     print(f"❌ API request failed: {e}")
@@ -5,32 +5,61 @@ Setup Test Script
 This script tests that all components are properly installed and configured.
 """
 
-import sys
 import os
+import sys
+import stat
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Third-party packages that must be installed
+REQUIRED_MODULES = (
+    "fastapi",
+    "uvicorn",
+    "requests",
+    "dotenv",
+    "starlette"
+)
 
+# Project modules the server needs
+SERVER_MODULES = ("mcp_logger", "search_server_with_logging")
 
-def test_imports():
+
+def _try_import(module):
+    """Import a module, returning (name, module or None, error)."""
+    try:
+        return module, importlib.import_module(module), None
+    except Exception as e:
+        return module, None, e
+
+
+def _import_all() -> Dict[str, Tuple[Optional[Any], Optional[Exception]]]:
+    """
+    Import every module the checks need exactly once.
+    
+    Returns:
+        Mapping of module name to (module or None, import error or None)
+    """
+    # Import independent packages concurrently, then the project modules that build on them
+    with ThreadPoolExecutor(max_workers=len(REQUIRED_MODULES)) as executor:
+        results = list(executor.map(_try_import, REQUIRED_MODULES))
+    results.extend(_try_import(module) for module in ("env_config",) + SERVER_MODULES)
+    return {name: (module, error) for name, module, error in results}
+
+
+def test_imports(imported):
     """Test that all required modules can be imported."""
     print("🔍 Testing imports...")
     
-    required_modules = [
-        "fastapi",
-        "uvicorn", 
-        "requests",
-        "dotenv",
-        "starlette"
-    ]
-    
     failed_imports = []
     
-    for module in required_modules:
-        try:
-            importlib.import_module(module)
+    for module in REQUIRED_MODULES:
+        error = imported[module][1]
+        if error is None:
             print(f"✅ {module}")
-        except ImportError as e:
-            print(f"❌ {module}: {e}")
+        else:
+            print(f"❌ {module}: {error}")
             failed_imports.append(module)
     
     if failed_imports:
@@ -42,7 +71,7 @@ def test_imports():
     return True
 
 
-def test_env_file():
+def test_env_file(imported):
     """Test that .env file exists and has required variables."""
     print("\n🔍 Testing .env file...")
     
@@ -57,14 +86,16 @@ def test_env_file():
     print("✅ .env file found")
     
     # Check for required variables
-    from dotenv import load_dotenv
-    load_dotenv()
+    env_config, error = imported["env_config"]
+    if env_config is None:
+        print(f"❌ Failed to load environment configuration: {error}")
+        return False
     
     required_vars = ["GOOGLE_API_KEY", "GOOGLE_CSE_ID"]
     missing_vars = []
     
     for var in required_vars:
-        if not os.getenv(var):
+        if not getattr(env_config, var):
             missing_vars.append(var)
     
     if missing_vars:
@@ -75,36 +106,39 @@ def test_env_file():
     return True
 
 
-def test_server_startup():
+def test_server_startup(imported):
     """Test that the server can be imported."""
     print("\n🔍 Testing server startup...")
     
-    try:
-        # Test importing the server modules
-        import mcp_logger
-        print("✅ mcp_logger imported successfully")
-        
-        import search_server_with_logging
-        print("✅ search_server_with_logging imported successfully")
-        
-        # Test that the app can be created
-        app = search_server_with_logging.app
-        print("✅ FastAPI app created successfully")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Server startup failed: {e}")
+    # The server modules were imported in the shared pass
+    for module in SERVER_MODULES:
+        error = imported[module][1]
+        if error is not None:
+            print(f"❌ Server startup failed: {error}")
+            return False
+        print(f"✅ {module} imported successfully")
+    
+    # Test that the app was created
+    if not hasattr(imported["search_server_with_logging"][0], "app"):
+        print("❌ Server startup failed: search_server_with_logging has no app")
         return False
+    print("✅ FastAPI app created successfully")
+    
+    return True
 
 
-def test_log_directory():
+def test_log_directory(imported):
     """Test that log directory can be created."""
     print("\n🔍 Testing log directory...")
     
-    log_dir = Path("mcp_logs")
+    log_dir = "mcp_logs"
     try:
-        log_dir.mkdir(exist_ok=True)
+        # Usually the directory already exists, so a single stat() is enough
+        try:
+            if not stat.S_ISDIR(os.stat(log_dir).st_mode):
+                raise NotADirectoryError(f"{log_dir} exists but is not a directory")
+        except FileNotFoundError:
+            os.mkdir(log_dir)
         print("✅ Log directory created/verified")
         return True
     except Exception as e:
@@ -127,9 +161,12 @@ def main():
     passed = 0
     total = len(tests)
     
+    # Import everything once; each check reads from the same results
+    imported = _import_all()
+    
     for test_name, test_func in tests:
         try:
-            if test_func():
+            if test_func(imported):
                 passed += 1
             else:
                 print(f"❌ {test_name} test failed")
@@ -6,7 +6,23 @@ Test client for the working search server.
 import requests
 import json
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Final, List, Optional, Tuple
+from http_session import retry_after
+import json_compat
+
+# Endpoint patterns to try, in priority order
+_ENDPOINT_PATHS = (
+    "/mcp/tools/search_web",
+    "/mcp/tools/call",
+    "/mcp/tools"
+)
+
+# Queries exercised by the tests
+TEST_QUERIES: Final[Tuple[str, ...]] = (
+    "OpenAI GPT-4 features",
+    "Python programming tips"
+)
 
 
 class WorkingMCPClient:
@@ -16,75 +32,121 @@ class WorkingMCPClient:
         self.base_url = base_url
         self.session = requests.Session()
         self.request_id = 1
+        # (endpoint, format index) that last returned 200
+        self._good_route: Optional[Tuple[str, int]] = None
+    
+    def _request_formats(self, query: str, num_results: int) -> List[Dict[str, Any]]:
+        """Return the request bodies to try, in priority order."""
+        return [
+            # Format 1: Direct tool call
+            {
+                "query": query,
+                "num_results": num_results
+            },
+            # Format 2: MCP JSON-RPC format
+            {
+                "jsonrpc": "2.0",
+                "id": self.request_id,
+                "method": "tools/call",
+                "params": {
+                    "name": "search_web",
+                    "arguments": {
+                        "query": query,
+                        "num_results": num_results
+                    }
+                }
+            },
+            # Format 3: Simple tool call
+            {
+                "name": "search_web",
+                "arguments": {
+                    "query": query,
+                    "num_results": num_results
+                }
+            }
+        ]
+    
+    def _post(self, endpoint: str, body: bytes):
+        """POST a pre-encoded JSON body, returning the response or the exception raised."""
+        try:
+            response = self.session.post(
+                endpoint,
+                data=body,
+                headers={"Content-Type": "application/json"}
+            )
+            # Back off only when the server asks us to
+            delay = retry_after(response)
+            if delay:
+                time.sleep(delay)
+                response = self.session.post(
+                    endpoint,
+                    data=body,
+                    headers={"Content-Type": "application/json"}
+                )
+            return response
+        except Exception as e:
+            return e
+    
+    def _report(self, response) -> Optional[Dict[str, Any]]:
+        """Print the outcome of one attempt, returning the parsed result on success."""
+        if isinstance(response, Exception):
+            print(f"  ❌ Error: {response}")
+            return None
+        
+        print(f"  📊 Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            try:
+                result = response.json()
+            except Exception as e:
+                print(f"  ❌ Error: {e}")
+                return None
+            print(f"  ✅ Success! Response: {json.dumps(result, indent=2)}")
+            return result
+        print(f"  ❌ Failed: {response.text}")
+        return None
     
     def test_search(self, query: str, num_results: int = 3):
         """Test the search_web tool."""
         print(f"\n🧪 Testing search with query: '{query}'")
         print("=" * 50)
         
-        # Try different endpoint patterns
-        endpoints_to_try = [
-            f"{self.base_url}/mcp/tools/search_web",
-            f"{self.base_url}/mcp/tools/call",
-            f"{self.base_url}/mcp/tools"
+        # Encode each format once; the same bodies are sent to every endpoint
+        bodies = [json_compat.dumps(request_data) for request_data in self._request_formats(query, num_results)]
+        
+        # Once an endpoint/format pair has worked, send only that
+        if self._good_route is not None:
+            endpoint, format_index = self._good_route
+            print(f"🔍 Using known working endpoint: {endpoint} (format {format_index + 1})")
+            result = self._report(self._post(endpoint, bodies[format_index]))
+            if result is not None:
+                return result
+            print("  ⚠️  Known route failed, probing all endpoints again...")
+            self._good_route = None
+        
+        # Try different endpoint patterns and request formats, all at once
+        routes = [
+            (f"{self.base_url}{path}", format_index)
+            for path in _ENDPOINT_PATHS
+            for format_index in range(len(bodies))
         ]
+        with ThreadPoolExecutor(max_workers=len(routes)) as executor:
+            responses = list(executor.map(
+                lambda route: self._post(route[0], bodies[route[1]]),
+                routes
+            ))
         
-        for endpoint in endpoints_to_try:
-            print(f"🔍 Trying endpoint: {endpoint}")
-            
-            # Try different request formats
-            request_formats = [
-                # Format 1: Direct tool call
-                {
-                    "query": query,
-                    "num_results": num_results
-                },
-                # Format 2: MCP JSON-RPC format
-                {
-                    "jsonrpc": "2.0",
-                    "id": self.request_id,
-                    "method": "tools/call",
-                    "params": {
-                        "name": "search_web",
-                        "arguments": {
-                            "query": query,
-                            "num_results": num_results
-                        }
-                    }
-                },
-                # Format 3: Simple tool call
-                {
-                    "name": "search_web",
-                    "arguments": {
-                        "query": query,
-                        "num_results": num_results
-                    }
-                }
-            ]
-            
-            for i, request_data in enumerate(request_formats, 1):
-                try:
-                    print(f"  📝 Trying format {i}...")
-                    
-                    response = self.session.post(
-                        endpoint,
-                        json=request_data,
-                        headers={"Content-Type": "application/json"}
-                    )
-                    
-                    print(f"  📊 Status: {response.status_code}")
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        print(f"  ✅ Success! Response: {json.dumps(result, indent=2)}")
-                        return result
-                    else:
-                        print(f"  ❌ Failed: {response.text}")
-                        
-                except Exception as e:
-                    print(f"  ❌ Error: {e}")
-            
-            print(f"  ⏭️  Moving to next endpoint...")
+        # Report in priority order and keep the first route that succeeded
+        for (endpoint, format_index), response in zip(routes, responses):
+            if format_index == 0:
+                print(f"🔍 Trying endpoint: {endpoint}")
+            print(f"  📝 Trying format {format_index + 1}...")
+            result = self._report(response)
+            if result is not None:
+                self._good_route = (endpoint, format_index)
+                return result
+            if format_index == len(bodies) - 1:
+                print(f"  ⏭️  Moving to next endpoint...")
         
         print("❌ All endpoints and formats failed")
         return None
@@ -98,20 +160,9 @@ def main():
     # Initialize client
     client = WorkingMCPClient()
     
-    # Test cases
-    test_queries = [
-        "OpenAI GPT-4 features",
-        "Python programming tips"
-    ]
-    
-    for i, query in enumerate(test_queries, 1):
+    for i, query in enumerate(TEST_QUERIES, 1):
         print(f"\n📋 Test {i}: {query}")
         result = client.test_search(query, num_results=2)
-        
-        # Wait a bit between requests
-        if i < len(test_queries):
-            print("⏳ Waiting 2 seconds before next test...")
-            time.sleep(2)
     
     print("\n✅ All tests completed!")
     print("\n📊 Check the logs with:")
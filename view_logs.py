@@ -6,14 +6,27 @@ This script provides tools to view and analyze the MCP traffic logs
 captured by the search server.
 """
 
-import json
+import mmap
 import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import BinaryIO, Dict, List, Any, NamedTuple
 import argparse
 
+import json_compat
+
+
+class _TailState(NamedTuple):
+    """An open log file being tailed, and how far it has been read."""
+    file: BinaryIO
+    inode: int
+    offset: int  # Bytes consumed so far
+    mtime_ns: int  # Modification time when offset was recorded
+
 
 class MCPLogViewer:
     """Viewer for MCP logs."""
@@ -26,6 +39,9 @@ class MCPLogViewer:
             "tool_calls": self.log_dir / "mcp_tool_calls.jsonl",
             "errors": self.log_dir / "mcp_errors.jsonl"
         }
+        # Per log type: the tail state and the trailing partial line
+        self._tail_state: Dict[str, _TailState] = {}
+        self._buffers: Dict[str, bytes] = {}
     
     def check_logs_exist(self) -> bool:
         """Check if any log files exist."""
@@ -37,107 +53,171 @@ class MCPLogViewer:
             return []
         
         entries = []
-        with open(file_path, 'r') as f:
+        with open(file_path, 'rb') as f:
             for line in f:
                 try:
-                    entries.append(json.loads(line.strip()))
-                except json.JSONDecodeError:
+                    entries.append(json_compat.loads(line))
+                except ValueError:
                     continue
         return entries
     
+    def read_jsonl_tail(self, file_path: Path, limit: int) -> List[Dict[str, Any]]:
+        """
+        Read only the last ``limit`` entries of a JSONL file.
+        
+        The file is memory-mapped and scanned backwards for newlines, so only
+        the returned lines are copied and parsed.
+        """
+        if limit <= 0 or not file_path.exists():
+            return []
+        
+        entries = []
+        with self._map(file_path) as mm:
+            if mm is None:
+                return []
+            end = len(mm)
+            while end > 0 and len(entries) < limit:
+                start = mm.rfind(b"\n", 0, end) + 1
+                try:
+                    entries.append(json_compat.loads(mm[start:end]))
+                except ValueError:
+                    pass
+                end = start - 1
+        entries.reverse()
+        return entries
+    
+    @staticmethod
+    @contextmanager
+    def _map(file_path: Path):
+        """Memory-map a file read-only, yielding None for an empty file."""
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ) if os.fstat(fd).st_size else None
+        finally:
+            os.close(fd)
+        try:
+            yield mm
+        finally:
+            if mm is not None:
+                mm.close()
+    
     def view_recent_requests(self, limit: int = 10):
         """View recent MCP requests."""
-        requests = self.read_jsonl_file(self.log_files["requests"])
-        print(f"\n📥 RECENT MCP REQUESTS (last {min(limit, len(requests))}):")
-        print("=" * 60)
-        
-        for entry in requests[-limit:]:
-            timestamp = entry.get("timestamp", "unknown")
-            request_id = entry.get("request_id", "unknown")
-            method = entry.get("data", {}).get("method", "unknown")
-            
-            print(f"🕒 {timestamp}")
-            print(f"🆔 {request_id}")
-            print(f"📋 Method: {method}")
+        sys.stdout.write(self._format_requests(limit))
+    
+    def _format_requests(self, limit: int) -> str:
+        """Return the report of recent requests."""
+        requests = self.read_jsonl_tail(self.log_files["requests"], limit)
+        
+        out = [f"\n📥 RECENT MCP REQUESTS (last {min(limit, len(requests))}):", "=" * 60]
+        
+        for entry in requests:
+            data = entry.get("data", {})
+            out.append(f"🕒 {entry.get('timestamp', 'unknown')}")
+            out.append(f"🆔 {entry.get('request_id', 'unknown')}")
+            out.append(f"📋 Method: {data.get('method', 'unknown')}")
             
             # Show request details
-            data = entry.get("data", {})
             if "params" in data:
                 params = data["params"]
                 if "name" in params:
-                    print(f"🔧 Tool: {params['name']}")
+                    out.append(f"🔧 Tool: {params['name']}")
                 if "arguments" in params:
-                    args = params["arguments"]
-                    print(f"📝 Arguments: {json.dumps(args, indent=2)}")
+                    out.append(f"📝 Arguments: {json_compat.dumps_pretty(params['arguments'])}")
             
-            print("-" * 40)
+            out.append("-" * 40)
+        
+        return "\n".join(out) + "\n"
     
     def view_recent_responses(self, limit: int = 10):
         """View recent MCP responses."""
-        responses = self.read_jsonl_file(self.log_files["responses"])
-        print(f"\n📤 RECENT MCP RESPONSES (last {min(limit, len(responses))}):")
-        print("=" * 60)
+        sys.stdout.write(self._format_responses(limit))
+    
+    def _format_responses(self, limit: int) -> str:
+        """Return the report of recent responses."""
+        responses = self.read_jsonl_tail(self.log_files["responses"], limit)
         
-        for entry in responses[-limit:]:
-            timestamp = entry.get("timestamp", "unknown")
-            request_id = entry.get("request_id", "unknown")
-            
-            print(f"🕒 {timestamp}")
-            print(f"🆔 {request_id}")
+        out = [f"\n📤 RECENT MCP RESPONSES (last {min(limit, len(responses))}):", "=" * 60]
+        
+        for entry in responses:
+            out.append(f"🕒 {entry.get('timestamp', 'unknown')}")
+            out.append(f"🆔 {entry.get('request_id', 'unknown')}")
             
             # Show response details
             data = entry.get("data", {})
             if "result" in data:
                 result = data["result"]
                 if "content" in result:
-                    content = result["content"]
-                    print(f"📄 Content: {json.dumps(content, indent=2)}")
+                    out.append(f"📄 Content: {json_compat.dumps_pretty(result['content'])}")
             
-            print("-" * 40)
+            out.append("-" * 40)
+        
+        return "\n".join(out) + "\n"
     
     def view_tool_calls(self, limit: int = 10):
         """View recent tool calls."""
-        tool_calls = self.read_jsonl_file(self.log_files["tool_calls"])
-        print(f"\n🔧 RECENT TOOL CALLS (last {min(limit, len(tool_calls))}):")
-        print("=" * 60)
+        sys.stdout.write(self._format_tool_calls(limit))
+    
+    def _format_tool_calls(self, limit: int) -> str:
+        """Return the report of recent tool calls."""
+        tool_calls = self.read_jsonl_tail(self.log_files["tool_calls"], limit)
+        
+        out = [f"\n🔧 RECENT TOOL CALLS (last {min(limit, len(tool_calls))}):", "=" * 60]
         
-        for entry in tool_calls[-limit:]:
-            timestamp = entry.get("timestamp", "unknown")
-            tool_name = entry.get("tool_name", "unknown")
+        for entry in tool_calls:
             arguments = entry.get("arguments", {})
             result = entry.get("result", {})
             
-            print(f"🕒 {timestamp}")
-            print(f"🔧 Tool: {tool_name}")
-            print(f"📝 Arguments: {json.dumps(arguments, indent=2)}")
-            print(f"📊 Result: {json.dumps(result, indent=2)}")
-            print("-" * 40)
+            out.append(f"🕒 {entry.get('timestamp', 'unknown')}")
+            out.append(f"🔧 Tool: {entry.get('tool_name', 'unknown')}")
+            out.append(f"📝 Arguments: {json_compat.dumps_pretty(arguments)}")
+            out.append(f"📊 Result: {json_compat.dumps_pretty(result)}")
+            out.append("-" * 40)
+        
+        return "\n".join(out) + "\n"
     
     def view_errors(self, limit: int = 10):
         """View recent errors."""
-        errors = self.read_jsonl_file(self.log_files["errors"])
-        print(f"\n❌ RECENT ERRORS (last {min(limit, len(errors))}):")
-        print("=" * 60)
-        
-        for entry in errors[-limit:]:
-            timestamp = entry.get("timestamp", "unknown")
-            error_type = entry.get("error_type", "unknown")
-            error_message = entry.get("error_message", "unknown")
+        sys.stdout.write(self._format_errors(limit))
+    
+    def _format_errors(self, limit: int) -> str:
+        """Return the report of recent errors."""
+        errors = self.read_jsonl_tail(self.log_files["errors"], limit)
+        
+        out = [f"\n❌ RECENT ERRORS (last {min(limit, len(errors))}):", "=" * 60]
+        
+        for entry in errors:
             context = entry.get("context", {})
             
-            print(f"🕒 {timestamp}")
-            print(f"🚨 Type: {error_type}")
-            print(f"💬 Message: {error_message}")
+            out.append(f"🕒 {entry.get('timestamp', 'unknown')}")
+            out.append(f"🚨 Type: {entry.get('error_type', 'unknown')}")
+            out.append(f"💬 Message: {entry.get('error_message', 'unknown')}")
             if context:
-                print(f"🔍 Context: {json.dumps(context, indent=2)}")
-            print("-" * 40)
+                out.append(f"🔍 Context: {json_compat.dumps_pretty(context)}")
+            out.append("-" * 40)
+        
+        return "\n".join(out) + "\n"
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get log statistics."""
+        """
+        Get log statistics.
+        
+        Returns:
+            Number of lines per log type. Lines are counted without being parsed,
+            so blank or malformed lines are included in the counts.
+        """
         stats = {}
         for name, file_path in self.log_files.items():
-            entries = self.read_jsonl_file(file_path)
-            stats[name] = len(entries)
+            # Count newlines, plus a final line without one, without parsing anything
+            count = 0
+            if file_path.exists():
+                with self._map(file_path) as mm:
+                    if mm is not None:
+                        # mmap has no count(); slicing copies, so count 1 MiB slices to bound memory
+                        block = 1 << 20
+                        count = sum(mm[i:i + block].count(b"\n") for i in range(0, len(mm), block))
+                        count += mm[-1:] != b"\n"
+            stats[name] = count
         
         return stats
     
@@ -147,10 +227,10 @@ class MCPLogViewer:
         print("\n📊 MCP LOG STATISTICS:")
         print("=" * 30)
         for name, count in stats.items():
-            print(f"   {name}: {count} entries")
+            print(f"   {name}: {count} lines")
         
         total = sum(stats.values())
-        print(f"   Total: {total} entries")
+        print(f"   Total: {total} lines")
     
     def tail_logs(self, file_type: str = "all", follow: bool = True):
         """Tail logs in real-time."""
@@ -179,22 +259,88 @@ class MCPLogViewer:
                 
         except KeyboardInterrupt:
             print("\n👋 Stopped tailing logs.")
+        finally:
+            for state in self._tail_state.values():
+                state.file.close()
+            self._tail_state.clear()
+            self._buffers.clear()
     
     def _tail_file(self, file_path: Path, file_type: str):
-        """Tail a specific log file."""
+        """
+        Print the entries appended to a log file since the last poll.
+        
+        The file stays open between polls and only the bytes past the saved
+        offset are read. The first poll starts at the latest complete entry.
+        A file is read again from the start when it was rotated (new inode),
+        truncated (smaller than the offset), or rewritten in place to the same
+        size (same size, newer mtime).
+        
+        Limitations: a file rewritten in place that ends up larger than the
+        offset looks like an append, so only its tail is shown; and an entry
+        still being written is shown only once its line is complete (a file
+        holding a single partial line shows nothing yet).
+        """
         try:
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
-                if lines:
-                    last_line = lines[-1].strip()
-                    try:
-                        entry = json.loads(last_line)
-                        timestamp = entry.get("timestamp", "unknown")
-                        print(f"[{timestamp}] {file_type.upper()}: {json.dumps(entry, indent=2)}")
-                    except json.JSONDecodeError:
-                        pass
+            st = os.stat(file_path)
+            state = self._tail_state.get(file_type)
+            if state is not None and (
+                state.inode != st.st_ino
+                or st.st_size < state.offset
+                or (st.st_size == state.offset and st.st_mtime_ns != state.mtime_ns)
+            ):
+                state.file.close()
+                state = _TailState(open(file_path, 'rb'), st.st_ino, 0, st.st_mtime_ns)
+                self._buffers[file_type] = b""
+            elif state is None:
+                f = open(file_path, 'rb')
+                state = _TailState(f, st.st_ino, self._last_line_offset(f, st.st_size), st.st_mtime_ns)
+                self._buffers[file_type] = b""
+            self._tail_state[file_type] = state
+            
+            if st.st_size == state.offset:
+                return
+            
+            # Read only up to the size seen by stat, so offset and mtime stay consistent
+            state.file.seek(state.offset)
+            buffer = self._buffers[file_type] + state.file.read(st.st_size - state.offset)
+            self._tail_state[file_type] = state._replace(offset=st.st_size, mtime_ns=st.st_mtime_ns)
+            
+            # Print each complete line and keep the partial one for the next poll
+            start = 0
+            end = buffer.find(b"\n")
+            while end != -1:
+                self._print_tail_entry(buffer[start:end], file_type)
+                start = end + 1
+                end = buffer.find(b"\n", start)
+            self._buffers[file_type] = buffer[start:]
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
+    
+    @staticmethod
+    def _last_line_offset(f: BinaryIO, size: int, block_size: int = 8192) -> int:
+        """Return the byte offset where the last complete line of a file starts."""
+        pos = size
+        data = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            end = data.rfind(b"\n")
+            if end > 0:
+                start = data.rfind(b"\n", 0, end)
+                if start != -1:
+                    return pos + start + 1
+        return 0
+    
+    def _print_tail_entry(self, line: bytes, file_type: str):
+        """Print one tailed log line, skipping lines that are not valid JSON."""
+        try:
+            entry = json_compat.loads(line)
+        except ValueError:
+            return
+        timestamp = entry.get("timestamp", "unknown")
+        print(f"[{timestamp}] {file_type.upper()}: {json_compat.dumps_pretty(entry)}")
 
 
 def main():
@@ -225,10 +371,17 @@ def main():
     # Show all log types
     if args.type == "all":
         viewer.print_statistics()
-        viewer.view_recent_requests(args.limit)
-        viewer.view_recent_responses(args.limit)
-        viewer.view_tool_calls(args.limit)
-        viewer.view_errors(args.limit)
+        # Read and format the four logs concurrently, then write them in order
+        formatters = (
+            viewer._format_requests,
+            viewer._format_responses,
+            viewer._format_tool_calls,
+            viewer._format_errors
+        )
+        with ThreadPoolExecutor(max_workers=len(formatters)) as executor:
+            futures = [executor.submit(formatter, args.limit) for formatter in formatters]
+            for future in futures:
+                sys.stdout.write(future.result())
     elif args.type == "requests":
         viewer.view_recent_requests(args.limit)
     elif args.type == "responses":
@@ -6,21 +6,30 @@ This script reads the contents of company_website.html and a target (ideal) snip
 """
 
 import os
+import re
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from openai_client_with_mcp import OpenAIClientWithMCP
 
+try:
+    import lxml  # noqa: F401  Optional C-based parser backend for BeautifulSoup
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# Matches the name attribute of the meta description tag, case-insensitively
+_DESC_RE = re.compile(r"^description$", re.I)
+
 
 def extract_website_content(html_path):
     with open(html_path, "r", encoding="utf-8") as f:
         html = f.read()
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, _HTML_PARSER)
     title = soup.title.string.strip() if soup.title else ""
-    meta_desc = ""
-    for tag in soup.find_all("meta"):
-        if tag.get("name", "").lower() == "description":
-            meta_desc = tag.get("content", "").strip()
-    first_paragraph = soup.find("p").get_text().strip() if soup.find("p") else ""
+    meta = soup.find("meta", attrs={"name": _DESC_RE})
+    meta_desc = meta.get("content", "").strip() if meta else ""
+    first_p = soup.find("p")
+    first_paragraph = first_p.get_text().strip() if first_p else ""
     return {
         "title": title,
         "meta_desc": meta_desc,
@@ -29,13 +38,26 @@ def extract_website_content(html_path):
     }
 
 
-def website_optimization_prompt(current_html, target_snippet):
+# Characters of raw HTML included in the prompt alongside the extracted fields
+_HTML_EXCERPT_CHARS = 4000
+
+
+def website_optimization_prompt(content, target_snippet):
+    """Build the prompt from the fields returned by extract_website_content, plus a short HTML excerpt."""
+    html_excerpt = content["html"][:_HTML_EXCERPT_CHARS]
+    if len(content["html"]) > _HTML_EXCERPT_CHARS:
+        html_excerpt += "\n[... HTML truncated ...]"
     return f"""
-You are an expert in SEO and web content optimization. Your task is to review a company's website HTML and propose content changes so that Google or an LLM will generate a snippet as close as possible to the provided target snippet.
+You are an expert in SEO and web content optimization. Your task is to review a company's website content and propose content changes so that Google or an LLM will generate a snippet as close as possible to the provided target snippet.
 
-Here is the current website HTML:
+Here is the current website content:
+- Title: {content["title"]}
+- Meta description: {content["meta_desc"]}
+- First paragraph: {content["first_paragraph"]}
+
+Beginning of the website HTML:
 ---
-{current_html}
+{html_excerpt}
 ---
 
 Here is the target snippet we want Google/LLM to generate:
@@ -48,7 +70,8 @@ Please propose specific content changes to the website's title, meta description
 """
 
 
-def main():
+def main(target_snippet=None):
+    """Propose website changes for target_snippet (read from target_snippet.txt if not given)."""
     load_dotenv()
     if not os.getenv("OPENAI_API_KEY"):
         print("❌ Error: OPENAI_API_KEY not found!")
@@ -58,14 +81,14 @@ def main():
     if not os.path.exists(html_path):
         print(f"❌ {html_path} not found!")
         return
-    if not os.path.exists(target_snippet_path):
-        print(f"❌ {target_snippet_path} not found!")
-        return
-    with open(target_snippet_path, "r", encoding="utf-8") as f:
-        target_snippet = f.read().strip()
-    with open(html_path, "r", encoding="utf-8") as f:
-        current_html = f.read()
-    prompt = website_optimization_prompt(current_html, target_snippet)
+    if target_snippet is None:
+        if not os.path.exists(target_snippet_path):
+            print(f"❌ {target_snippet_path} not found!")
+            return
+        with open(target_snippet_path, "r", encoding="utf-8") as f:
+            target_snippet = f.read().strip()
+    data = extract_website_content(html_path)
+    prompt = website_optimization_prompt(data, target_snippet)
     print("\n📝 Sending prompt to LLM (HTML omitted for brevity)...")
     client = OpenAIClientWithMCP()
     try:
@@ -78,11 +101,17 @@ def main():
         # If the LLM output is very long (e.g., full HTML), truncate and warn
         max_chars = 2000
         max_lines = 40
-        lines = llm_answer.splitlines()
-        if len(llm_answer) > max_chars or len(lines) > max_lines:
+        line_count = llm_answer.count("\n") + (not llm_answer.endswith("\n")) if llm_answer else 0
+        if len(llm_answer) > max_chars or line_count > max_lines:
             print("[Output truncated. Showing first part only.]")
-            print("\n".join(lines[:max_lines]))
-            print(f"\n... [truncated, total {len(lines)} lines, {len(llm_answer)} chars] ...")
+            # Cut at the max_lines-th newline instead of splitting the whole answer
+            end = -1
+            for _ in range(max_lines):
+                end = llm_answer.find("\n", end + 1)
+                if end == -1:
+                    break
+            print(llm_answer[:end] if end != -1 else llm_answer)
+            print(f"\n... [truncated, total {line_count} lines, {len(llm_answer)} chars] ...")
         else:
             print(llm_answer)
         print("=" * 50)
@@ -92,14 +121,11 @@ def main():
             f.write(llm_answer.strip() + "\n")
         print("✅ Saved proposed changes to proposed_website_changes.md")
         # Also save the optimal snippet if available
-        if os.path.exists("target_snippet.txt"):
-            with open("target_snippet.txt", "r", encoding="utf-8") as f_snip:
-                snippet = f_snip.read().strip()
-            if snippet:
-                with open("proposed_website_changes.md", "a", encoding="utf-8") as f:
-                    f.write("\n---\n\n# Optimal Snippet\n\n")
-                    f.write(snippet + "\n")
-                print("✅ Saved optimal snippet to proposed_website_changes.md")
+        if target_snippet:
+            with open("proposed_website_changes.md", "a", encoding="utf-8") as f:
+                f.write("\n---\n\n# Optimal Snippet\n\n")
+                f.write(target_snippet.strip() + "\n")
+            print("✅ Saved optimal snippet to proposed_website_changes.md")
     except Exception as e:
         print(f"❌ LLM call failed: {e}")
 